@@ -0,0 +1,240 @@
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Already-compressed formats are stored as-is
+UNCOMPRESSED_EXTENSIONS = (".xlsx", ".xlsm", ".zip", ".gz")
+
+
+class BackupStore:
+    """
+    Content-addressed, deduplicated backup store with a retention policy.
+
+    Each snapshot's bytes live once under ``objects/<sha256>`` (gzip-compressed
+    unless the format is already compressed); a small SQLite manifest records
+    which source each snapshot belongs to and when it was taken. Taking a
+    snapshot of an unchanged file stores nothing new. After each snapshot the
+    retention policy keeps the ``keep_last`` newest snapshots plus the newest
+    one per day for ``keep_daily`` days and per week for ``keep_weekly`` weeks;
+    objects no snapshot references any more are deleted.
+    """
+
+    def __init__(self, root: str, keep_last: int = 10, keep_daily: int = 7, keep_weekly: int = 4):
+        self.root = os.path.abspath(root)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.root, "manifest.db")
+        with self._manifest() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    original_path TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    object_name TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_snapshots_source ON snapshots (source, created_at)")
+
+    @contextmanager
+    def _manifest(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.manifest_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _object_path(self, object_name: str) -> str:
+        return os.path.join(self.objects_dir, object_name[:2], object_name)
+
+    def _snapshot(self, row: sqlite3.Row) -> Dict:
+        """A manifest row plus ``object_path``, where its (possibly gzipped) bytes are stored"""
+        snapshot = dict(row)
+        snapshot["object_path"] = self._object_path(snapshot["object_name"])
+        return snapshot
+
+    def _store_object(self, path: str) -> tuple:
+        """Hash a file and store it if no object with that content exists yet"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        compress = not path.lower().endswith(UNCOMPRESSED_EXTENSIONS)
+        object_name = sha256 + (".gz" if compress else "")
+        object_path = self._object_path(object_name)
+
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(object_path))
+            try:
+                with open(path, "rb") as src, os.fdopen(fd, "wb") as raw:
+                    if compress:
+                        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=3, mtime=0) as dst:
+                            shutil.copyfileobj(src, dst, 1 << 20)
+                    else:
+                        shutil.copyfileobj(src, raw, 1 << 20)
+                os.replace(tmp_path, object_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return sha256, object_name
+
+    def snapshot_file(
+        self,
+        path: str,
+        source: Optional[str] = None,
+        original_path: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Back up a file; returns the snapshot (the latest one if the content is
+        unchanged), see ``_snapshot``
+        """
+        if not os.path.exists(path):
+            return None
+        source = source or os.path.basename(path)
+        size = os.path.getsize(path)
+        sha256, object_name = self._store_object(path)
+
+        with self._manifest() as conn:
+            latest = conn.execute(
+                "SELECT * FROM snapshots WHERE source = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+                (source,)
+            ).fetchone()
+            if latest is not None and latest["sha256"] == sha256:
+                return self._snapshot(latest)
+            cursor = conn.execute(
+                """
+                INSERT INTO snapshots (source, original_path, sha256, size, object_name, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (source, os.path.abspath(original_path or path), sha256, size, object_name, datetime.now().isoformat())
+            )
+            snapshot = self._snapshot(
+                conn.execute("SELECT * FROM snapshots WHERE id = ?", (cursor.lastrowid,)).fetchone()
+            )
+        logger.info(f"Backed up {path} as snapshot {snapshot['id']} ({sha256[:12]})")
+        self.prune(source)
+        return snapshot
+
+    def snapshot_sqlite(self, db_path: str, source: Optional[str] = None) -> Optional[Dict]:
+        """Consistent online backup of a live SQLite database (VACUUM INTO)"""
+        if not os.path.exists(db_path):
+            return None
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".db")
+        os.close(fd)
+        os.remove(tmp_path)  # VACUUM INTO requires the target not to exist
+        try:
+            conn = sqlite3.connect(db_path, timeout=30)
+            try:
+                conn.execute("VACUUM INTO ?", (tmp_path,))
+            finally:
+                conn.close()
+            return self.snapshot_file(tmp_path, source or os.path.basename(db_path), original_path=db_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def list(self, source: Optional[str] = None) -> List[Dict]:
+        with self._manifest() as conn:
+            if source is None:
+                rows = conn.execute("SELECT * FROM snapshots ORDER BY created_at DESC, id DESC")
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM snapshots WHERE source = ? ORDER BY created_at DESC, id DESC", (source,)
+                )
+            return [self._snapshot(row) for row in rows]
+
+    def prune(self, source: str) -> int:
+        """Apply the retention policy to one source; returns snapshots removed"""
+        snapshots = self.list(source)
+        keep = {s["id"] for s in snapshots[:self.keep_last]}
+        now = datetime.now()
+        days, weeks = set(), set()
+        for snapshot in snapshots:  # Newest first, so the first per period wins
+            created = datetime.fromisoformat(snapshot["created_at"])
+            day = created.date()
+            week = tuple(created.isocalendar()[:2])
+            if now - created <= timedelta(days=self.keep_daily) and day not in days:
+                days.add(day)
+                keep.add(snapshot["id"])
+            if now - created <= timedelta(weeks=self.keep_weekly) and week not in weeks:
+                weeks.add(week)
+                keep.add(snapshot["id"])
+
+        removed = [s["id"] for s in snapshots if s["id"] not in keep]
+        if removed:
+            with self._manifest() as conn:
+                conn.executemany("DELETE FROM snapshots WHERE id = ?", [(i,) for i in removed])
+            self.collect_garbage()
+        return len(removed)
+
+    def collect_garbage(self) -> int:
+        """Delete stored objects that no snapshot references"""
+        with self._manifest() as conn:
+            referenced = {row[0] for row in conn.execute("SELECT DISTINCT object_name FROM snapshots")}
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                if filename not in referenced and not filename.startswith("tmp"):
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+        return removed
+
+    def restore(self, snapshot_id: int, dest_path: Optional[str] = None) -> str:
+        """Write a snapshot back to disk (its original path by default), atomically"""
+        with self._manifest() as conn:
+            snapshot = conn.execute("SELECT * FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        if snapshot is None:
+            raise KeyError(f"No backup snapshot {snapshot_id}")
+        dest_path = os.path.abspath(dest_path or snapshot["original_path"])
+        object_path = self._object_path(snapshot["object_name"])
+
+        tmp_path = f"{dest_path}.restore"
+        opener = gzip.open if snapshot["object_name"].endswith(".gz") else open
+        with opener(object_path, "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        # A leftover WAL from the replaced database would be replayed onto the restored one
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(dest_path + suffix):
+                os.remove(dest_path + suffix)
+        os.replace(tmp_path, dest_path)
+        logger.info(f"Restored snapshot {snapshot_id} to {dest_path}")
+        return dest_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and restore asset backups")
+    parser.add_argument("--root", default="backups", help="Backup directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_cmd = commands.add_parser("list", help="List snapshots")
+    list_cmd.add_argument("source", nargs="?", help="e.g. assets.db or Book1.xlsx")
+    restore_cmd = commands.add_parser("restore", help="Restore a snapshot (stop the API first)")
+    restore_cmd.add_argument("snapshot_id", type=int)
+    restore_cmd.add_argument("dest", nargs="?", help="Target path (defaults to the original path)")
+    args = parser.parse_args()
+
+    store = BackupStore(args.root)
+    if args.command == "list":
+        for s in store.list(args.source):
+            print(f"{s['id']:>6}  {s['created_at']}  {s['source']:<20} {s['size']:>12}  {s['sha256'][:12]}")
+    else:
+        print(f"Restored to {store.restore(args.snapshot_id, args.dest)}")
@@ -0,0 +1,317 @@
+"""
+Benchmarks for the Excel/SQLite sync layer and the HTTP API.
+
+Generates a synthetic asset workbook, runs each scenario against it in a
+scratch directory and writes latency percentiles and throughput as JSON so
+runs can be compared:
+
+    python benchmark.py --sheets 3 --rows 20000 --out results.json
+    python benchmark.py --rows 20000 --compare baseline.json --out new.json
+
+``--url`` points the HTTP scenarios at a running server instead of an
+in-process TestClient.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from openpyxl import Workbook, load_workbook
+
+HEADER = [
+    "Asset Tag", "Serial Number", "Model", "Manufacturer", "Category", "User ID", "User Name",
+    "Department", "Location", "Status", "Date of Purchase", "Date of Return", "Date of Reassign", "Cost",
+]
+DEPARTMENTS = ["IT", "Finance", "HR", "Sales", "Marketing", "Operations", "Legal", "Engineering", "Support"]
+LOCATIONS = ["Chennai", "Bangalore", "Mumbai", "Delhi", "Hyderabad", "Pune", "Remote"]
+MODELS = [
+    ("Dell", "Latitude 5420", "Laptop"), ("Dell", "OptiPlex 7090", "Desktop"),
+    ("Lenovo", "ThinkPad T14", "Laptop"), ("HP", "EliteBook 840", "Laptop"),
+    ("Apple", "MacBook Pro 14", "Laptop"), ("LG", "27UL500", "Monitor"), ("Cisco", "IP Phone 8845", "Phone"),
+]
+STATUSES = ["Assigned", "Assigned", "Assigned", "In Stock", "In Repair", "Retired"]
+FIRST_NAMES = ["Anbu", "Priya", "Rahul", "Divya", "Karthik", "Meena", "Arjun", "Sneha", "Vijay", "Lakshmi"]
+LAST_NAMES = ["Selvan", "Kumar", "Sharma", "Iyer", "Reddy", "Nair", "Patel", "Rao", "Das", "Menon"]
+
+
+def asset_tag(sheet: int, row: int) -> str:
+    return f"AT{sheet:02d}{row:07d}"
+
+
+def generate_workbook(path: str, sheets: int, rows: int, seed: int = 42) -> Dict:
+    """Write a synthetic asset workbook (streamed, so large sizes are cheap)"""
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    started = date(2018, 1, 1)
+    for sheet in range(sheets):
+        ws = wb.create_sheet(title=f"assets_{sheet}" if sheet else "employees")
+        ws.append(HEADER)
+        for row in range(rows):
+            manufacturer, model, category = rng.choice(MODELS)
+            status = rng.choice(STATUSES)
+            assigned = status == "Assigned"
+            purchased = started + timedelta(days=rng.randrange(2500))
+            ws.append([
+                asset_tag(sheet, row),
+                f"SN{rng.getrandbits(40):010X}",
+                model,
+                manufacturer,
+                category,
+                f"E{rng.randrange(100000):05d}" if assigned else None,
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" if assigned else None,
+                rng.choice(DEPARTMENTS),
+                rng.choice(LOCATIONS),
+                status,
+                datetime.combine(purchased, datetime.min.time()),
+                datetime.combine(purchased + timedelta(days=rng.randrange(30, 1500)), datetime.min.time())
+                if rng.random() < 0.2 else None,
+                datetime.combine(purchased + timedelta(days=rng.randrange(1, 900)), datetime.min.time())
+                if rng.random() < 0.3 else None,
+                round(rng.uniform(150, 3500), 2),
+            ])
+    wb.save(path)
+    return {"path": path, "sheets": sheets, "rows_per_sheet": rows, "bytes": os.path.getsize(path)}
+
+
+def touch_workbook(path: str, changes: int, seed: int = 7):
+    """Edit ``changes`` rows of the first sheet, as a user saving the workbook would"""
+    rng = random.Random(seed)
+    wb = load_workbook(path)
+    ws = wb.worksheets[0]
+    user_col = HEADER.index("User Name") + 1
+    for row in rng.sample(range(2, ws.max_row + 1), min(changes, ws.max_row - 1)):
+        ws.cell(row=row, column=user_col, value=f"Edited {rng.randrange(10 ** 6)}")
+    wb.save(path)
+
+
+def summarize(latencies: List[float], wall_seconds: Optional[float] = None) -> Dict:
+    """Count, throughput and latency percentiles (ms) for a list of durations in seconds"""
+    ordered = sorted(latencies)
+    wall = wall_seconds if wall_seconds is not None else sum(ordered)
+
+    def pct(p: float) -> float:
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "wall_seconds": round(wall, 4),
+        "throughput_per_s": round(len(ordered) / wall, 2) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def timed(func: Callable, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def run_concurrent(func: Callable[[int], object], requests: int, concurrency: int) -> Dict:
+    """Call func(i) for i in range(requests) from ``concurrency`` threads"""
+    def one(i: int) -> float:
+        return timed(func, i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def bench_sync(workdir: str, workbook: str, args) -> Dict:
+    """ExcelSQLiteSync scenarios: imports, exports, lookups and reassignments"""
+    from excel_processor import ExcelSQLiteSync
+
+    results = {}
+    db_path = os.path.join(workdir, "bench.db")
+    started = time.perf_counter()
+    sync = ExcelSQLiteSync(excel_path=workbook, db_path=db_path)  # Runs the initial full import
+    results["excel_to_sqlite.initial"] = summarize([time.perf_counter() - started])
+    results["excel_to_sqlite.unchanged"] = summarize([timed(sync.excel_to_sqlite)])
+
+    touch_workbook(workbook, args.changes)
+    results["excel_to_sqlite.incremental"] = summarize([timed(sync.excel_to_sqlite)])
+    results["excel_to_sqlite.full"] = summarize([timed(sync.excel_to_sqlite, incremental=False)])
+
+    rng = random.Random(1)
+    tags = [asset_tag(rng.randrange(args.sheets), rng.randrange(args.rows)) for _ in range(args.requests)]
+    results["get_asset_by_tag"] = run_concurrent(
+        lambda i: sync.get_asset_by_tag(tags[i]), args.requests, args.concurrency
+    )
+    results["reassign_asset"] = run_concurrent(
+        lambda i: sync.reassign_asset(tags[i], {"user_name": f"Bench {i}"}),
+        args.requests, args.concurrency
+    )
+
+    results["sqlite_to_excel.incremental"] = summarize([timed(sync.sqlite_to_excel)])
+    results["sqlite_to_excel.full"] = summarize([timed(sync.sqlite_to_excel, incremental=False)])
+    results["db_bytes"] = os.path.getsize(db_path)
+    return results
+
+
+def bench_http(workdir: str, workbook: str, args) -> Dict:
+    """API scenarios under concurrent load (in-process TestClient or --url)"""
+    rng = random.Random(2)
+    tags = [asset_tag(rng.randrange(args.sheets), rng.randrange(args.rows)) for _ in range(args.requests)]
+
+    if args.url:
+        import httpx
+        client = httpx.Client(base_url=args.url, timeout=60)
+        closer = client.close
+    else:
+        # main reads its configuration at import time
+        os.environ["ASSET_EXCEL_PATH"] = workbook
+        os.environ["ASSET_DB_PATH"] = os.path.join(workdir, "api.db")
+        import main
+        from fastapi.testclient import TestClient
+        main.WATCH_EXCEL_FILE = False
+        main.SYNC_AFTER_WRITES = False
+        client = TestClient(main.app)
+        client.__enter__()
+        closer = lambda: client.__exit__(None, None, None)
+
+    # Warm-up (admin seed, initial import) runs in the background after startup
+    deadline = time.monotonic() + 600
+    while client.get("/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            closer()
+            raise RuntimeError("Server did not become ready")
+        time.sleep(0.1)
+
+    try:
+        results = {}
+        login = {"username": args.username, "password": args.password}
+        results["POST /token"] = run_concurrent(
+            lambda i: client.post("/token", data=login).raise_for_status(),
+            max(1, args.requests // 50), min(args.concurrency, 4)
+        )
+        token = client.post("/token", data=login).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def check(response):
+            if response.status_code >= 500:
+                raise RuntimeError(f"{response.request.url}: {response.status_code} {response.text[:200]}")
+
+        results["GET /assets/{asset_tag}"] = run_concurrent(
+            lambda i: check(client.get(f"/assets/{tags[i]}", headers=headers)), args.requests, args.concurrency
+        )
+        results["GET /assets"] = run_concurrent(
+            lambda i: check(client.get("/assets", params={"department": DEPARTMENTS[i % len(DEPARTMENTS)]},
+                                       headers=headers)),
+            args.requests, args.concurrency
+        )
+        results["GET /assets/search"] = run_concurrent(
+            lambda i: check(client.get("/assets/search", params={"q": rng.choice(LAST_NAMES)}, headers=headers)),
+            args.requests, args.concurrency
+        )
+        results["PUT /assets/{asset_tag}/reassign"] = run_concurrent(
+            lambda i: check(client.put(f"/assets/{tags[i]}/reassign", json={"user_name": f"Bench {i}"},
+                                       headers=headers)),
+            args.requests, args.concurrency
+        )
+        return results
+    finally:
+        closer()
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Scenarios whose p95 latency grew by more than ``tolerance`` (a fraction)"""
+    regressions = []
+    for group, scenarios in current["results"].items():
+        for name, stats in scenarios.items():
+            old = baseline.get("results", {}).get(group, {}).get(name)
+            if not isinstance(stats, dict) or not isinstance(old, dict) or not old.get("p95_ms"):
+                continue
+            change = stats["p95_ms"] / old["p95_ms"] - 1
+            line = f"{group:>5} {name:<36} p95 {old['p95_ms']:>10.3f} -> {stats['p95_ms']:>10.3f} ms ({change:+.1%})"
+            print(line)
+            if change > tolerance:
+                regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asset sync layer and API")
+    parser.add_argument("--sheets", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per sheet")
+    parser.add_argument("--changes", type=int, default=100, help="Rows edited for incremental runs")
+    parser.add_argument("--requests", type=int, default=2000, help="Calls per lookup/HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", choices=["sync", "http"], help="Run one group of scenarios")
+    parser.add_argument("--url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--out", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown before failing")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    args = parser.parse_args()
+    args.changes = max(1, min(args.changes, args.rows))
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="asset-bench-")
+    os.chdir(workdir)  # users.db and backups/ are created relative to the working directory
+    try:
+        workbook = os.path.join(workdir, "Book1.xlsx")
+        started = time.perf_counter()
+        info = generate_workbook(workbook, args.sheets, args.rows, args.seed)
+        info["generate_seconds"] = round(time.perf_counter() - started, 3)
+
+        results = {}
+        if args.only in (None, "sync"):
+            results["sync"] = bench_sync(workdir, workbook, args)
+        if args.only in (None, "http"):
+            http_workbook = os.path.join(workdir, "api.xlsx")
+            generate_workbook(http_workbook, args.sheets, args.rows, args.seed)
+            results["http"] = bench_http(workdir, http_workbook, args)
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "password")},
+        "workbook": {k: v for k, v in info.items() if k != "path"},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) slower than the {args.tolerance:.0%} tolerance")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import sqlite3
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import logging
+from metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+# Pragmas applied once when a connection is opened
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",      # Readers don't block on the export/import writer
+    "synchronous": "NORMAL",    # Safe with WAL, avoids an fsync per commit
+    "cache_size": -20000,       # ~20MB page cache per connection
+    "mmap_size": 268435456,     # 256MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# Statement kinds reported separately in query metrics; anything else is "OTHER"
+QUERY_TYPES = {
+    "SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH",
+    "CREATE", "DROP", "ALTER", "PRAGMA", "VACUUM",
+}
+
+QUERY_SECONDS = histogram(
+    "sqlite_query_duration_seconds",
+    "Time to execute a SQLite statement (first step for SELECTs)",
+    ("db", "type"),
+)
+QUERY_ERRORS = counter("sqlite_query_errors_total", "SQLite statements that raised", ("db", "type"))
+
+
+def _query_type(sql: str) -> str:
+    keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return keyword if keyword in QUERY_TYPES else "OTHER"
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that records statement timings under the connection's database label"""
+
+    def _timed(self, method, sql: str, params):
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        except sqlite3.Error:
+            QUERY_ERRORS.inc(db=self.connection.metrics_label, type=_query_type(sql))
+            raise
+        finally:
+            QUERY_SECONDS.observe(
+                time.perf_counter() - started, db=self.connection.metrics_label, type=_query_type(sql)
+            )
+
+    def execute(self, sql: str, params=()):
+        return self._timed(super().execute, sql, params)
+
+    def executemany(self, sql: str, params):
+        return self._timed(super().executemany, sql, params)
+
+
+class _TimedConnection(sqlite3.Connection):
+    metrics_label = ""
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute* don't go through cursor(), so route them explicitly
+    def execute(self, sql: str, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, params):
+        return self.cursor().executemany(sql, params)
+
+
+class SQLitePool:
+    """
+    Per-thread persistent SQLite connections.
+
+    Each worker thread keeps its own connection open for its lifetime, so
+    connect/close and pragma setup happen once per thread instead of once per
+    query. Nested use from the same thread reuses the same connection, and
+    the outermost block commits (or rolls back on error).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_connections: int = 16,
+        timeout: float = 30.0,
+        cached_statements: int = 256,
+        pragmas: Optional[Dict] = None,
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._metrics = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "in_use": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # Only so close_all() can run from any thread
+            cached_statements=self.cached_statements,
+            factory=_TimedConnection,
+        )
+        conn.metrics_label = os.path.basename(self.db_path)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _prune(self):
+        """Close connections owned by threads that have exited"""
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            self._connections.pop(ident).close()
+            self._metrics["connections_closed"] += 1
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            with self._lock:
+                self._prune()
+                self._connections[threading.get_ident()] = conn
+                self._metrics["connections_opened"] += 1
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out this thread's connection; commits on success, rolls back on error"""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            # Re-entrant use from the same thread shares the outer transaction
+            self._local.depth = depth + 1
+            try:
+                yield self._local.conn
+            finally:
+                self._local.depth = depth
+            return
+
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out waiting for a connection to {self.db_path}")
+        waited = time.perf_counter() - started
+
+        with self._lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["in_use"] += 1
+            self._metrics["wait_time_total"] += waited
+            self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], waited)
+
+        self._local.depth = 1
+        try:
+            conn = self._thread_connection()
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                conn.row_factory = None
+        finally:
+            self._local.depth = 0
+            with self._lock:
+                self._metrics["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """Pool metrics snapshot"""
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["connections_open"] = len(self._connections)
+        stats["max_connections"] = self.max_connections
+        stats["wait_time_avg"] = (
+            stats["wait_time_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        )
+        return stats
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._metrics["connections_closed"] += len(self._connections)
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, **kwargs) -> SQLitePool:
+    """Shared pool for a database file (one per absolute path)"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = SQLitePool(key, **kwargs)
+            logger.info(f"Opened connection pool for {key}")
+        return _pools[key]
+
+
+def pool_stats() -> Dict[str, Dict]:
+    """Metrics for every open pool, keyed by database path"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {path: pool.stats() for path, pool in pools}
@@ -1,20 +1,260 @@
 import sqlite3
-import pandas as pd
 import os
-import shutil
+import math
 import datetime
-from typing import List, Dict
+import json
+import hashlib
+import base64
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Collection, Iterator, List, Dict, Optional
 from fastapi import HTTPException
 import logging
+from db_pool import get_pool
+from backup_store import BackupStore
+from cache import TTLCache
+from metrics import counter, gauge, histogram
+from process_lock import InterProcessLock
+from schema_inference import (
+    AFFINITIES, ColumnProfile, column_definition, infer_schema, normalize_date, to_excel_date
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Internal bookkeeping tables (never exported back to Excel)
+CATALOG_TABLE = "_asset_catalog"
+TAG_INDEX_TABLE = "_asset_tag_index"
+ROW_HASH_TABLE = "_asset_row_hashes"
+SYNC_META_TABLE = "_sync_meta"
+CHANGE_LOG_TABLE = "_asset_changes"
+STAGING_TABLE = "_import_staging"
+COLUMN_INDEX_TABLE = "_asset_column_indexes"
+VERSION_TABLE = "_asset_versions"
+SUMMARY_TABLE = "_asset_summary"
+# Per-table FTS5 index, rowid = rowid of the asset row
+SEARCH_TABLE_PREFIX = "_search_"
+
+# Rows per executemany batch / cursor fetch when streaming sheets
+CHUNK_SIZE = 5000
+# Bound parameters per IN (...) query in bulk operations
+MAX_SQL_VARIABLES = 500
+
+# Columns indexed on import (when present) for asset listing filters
+DEFAULT_INDEXED_COLUMNS = ("department", "location", "user_name", "user_id", "status")
+# Filter uses of an unindexed column before list_assets indexes it
+AUTO_INDEX_AFTER = 20
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 500
+# list_assets filter suffixes for range queries (?date_of_return__gte=2024-01-01)
+RANGE_OPERATORS = {"gte": ">=", "gt": ">", "lte": "<=", "lt": "<"}
+SEARCH_MAX_LIMIT = 100
+
+# Dimensions counted in the summary table -> SQL expression over an asset row.
+# A dimension is kept for a table only when it has every column listed.
+SUMMARY_DIMENSIONS = {
+    "department": (("department",), "department"),
+    "location": (("location",), "location"),
+    "assignment": (
+        ("user_id", "user_name"),
+        "CASE WHEN TRIM(COALESCE(user_id, '')) != '' OR TRIM(COALESCE(user_name, '')) != '' "
+        "THEN 'assigned' ELSE 'unassigned' END",
+    ),
+    # Per day, so pending returns are a range sum over distinct dates
+    "date_of_return": (("date_of_return",), "substr(date_of_return, 1, 10)"),
+}
+ISO_DATE_GLOB = "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+# Upcoming return dates listed individually by get_summary
+SUMMARY_UPCOMING_RETURNS = 30
+
+SYNC_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+IMPORT_SECONDS = histogram(
+    "excel_import_duration_seconds", "Excel -> SQLite import time", ("outcome",), SYNC_BUCKETS
+)
+EXPORT_SECONDS = histogram(
+    "excel_export_duration_seconds", "SQLite -> Excel export time", ("mode",), SYNC_BUCKETS
+)
+SHEET_ROWS = gauge("excel_sheet_rows", "Rows per sheet at its last import/export", ("sheet", "direction"))
+SHEET_ROW_CHANGES = counter(
+    "excel_import_row_changes_total", "Rows inserted/updated/deleted by incremental imports", ("sheet", "change")
+)
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote a table/column name for use in SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _normalize_column(col) -> str:
+    """Convert an Excel header to a valid database field name"""
+    return (
+        str(col).strip()                # Remove whitespace
+        .lower()                        # Convert to lowercase
+        .replace(' ', '_')              # Replace spaces with underscores
+        .replace('-', '_')              # Replace hyphens with underscores
+        .replace('(', '')               # Remove special characters
+        .replace(')', '')
+        .replace('/', '_')
+        .replace('\\', '_')
+        .replace('.', '_')
+        .replace('$', '')
+        .replace('%', 'percent')
+    )
+
+
+def _sql_value(value):
+    """Convert a spreadsheet cell to a value sqlite3 can bind (dates as ISO 8601 text)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return normalize_date(value)
+    if isinstance(value, datetime.time):
+        return str(value)
+    if hasattr(value, "item"):  # numpy scalar
+        return value.item()
+    return value
+
+
+def _unique_columns(header: List) -> List[str]:
+    """Normalized, non-empty, de-duplicated column names for a header row"""
+    columns = []
+    for i, col in enumerate(header):
+        name = _normalize_column(col) if col is not None else ""
+        # Ensure no empty column names
+        name = name or f"col_{i}"
+        base, n = name, 1
+        while name in columns:
+            name = f"{base}_{n}"
+            n += 1
+        columns.append(name)
+    return columns
+
+
+def _iter_sheet(ws):
+    """Yield (header, rows) for a read-only worksheet, raw rows padded/trimmed to the header"""
+    rows = ws.iter_rows(values_only=True)
+    header = list(next(rows, None) or [])
+    while header and header[-1] is None:
+        header.pop()
+    width = len(header)
+
+    def body():
+        for row in rows:
+            row = list(row[:width]) + [None] * (width - len(row))
+            if all(v is None for v in row):
+                continue
+            yield row
+
+    return header, body()
+
+
+def _encode_cursor(value, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _filter_values(value: str) -> List:
+    """Query-string value plus its numeric form, so filters match numeric cells too"""
+    values = [value]
+    for parse in (int, float):
+        try:
+            values.append(parse(value))
+            break
+        except ValueError:
+            continue
+    return values
+
+
+def _range_value(column: str, column_type: Optional[str], value: str):
+    """Bound for a range filter, in the form the column is stored in"""
+    if column_type == "date":
+        normalized = normalize_date(value)
+        if normalized == value and not value[:10].replace("-", "").isdigit():
+            raise ValueError(f"Range filter on {column} needs a date, got {value!r}")
+        return normalized
+    if column_type in ("integer", "real"):
+        for parse in (int, float):
+            try:
+                return parse(value)
+            except ValueError:
+                continue
+        raise ValueError(f"Range filter on {column} needs a number, got {value!r}")
+    return value
+
+
+def _search_table(table: str) -> str:
+    return _quote_identifier(f"{SEARCH_TABLE_PREFIX}{table}")
+
+
+def _search_body(columns: List[str], alias: str = "") -> str:
+    """SQL expression concatenating the searchable columns of a row"""
+    prefix = f"{alias}." if alias else ""
+    return " || ' ' || ".join(f"COALESCE({prefix}{_quote_identifier(c)}, '')" for c in columns)
+
+
+def _chunks(items: List, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _row_hash(values: List) -> bytes:
+    return hashlib.blake2b(repr(values).encode(), digest_size=8).digest()
+
+
+def _version_info(version: int, updated_at: str) -> Dict:
+    """ETag and Last-Modified (UTC, as stored by CURRENT_TIMESTAMP) for an asset version"""
+    last_modified = datetime.datetime.fromisoformat(updated_at).replace(tzinfo=datetime.timezone.utc)
+    return {
+        "version": version,
+        "etag": f'"{version}-{int(last_modified.timestamp())}"',
+        "last_modified": last_modified,
+    }
+
+
+def _file_signature(path: str) -> str:
+    """Cheap change check (mtime and size) consulted before hashing the workbook"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 class ExcelSQLiteSync:
-    def __init__(self, excel_path: str, db_path: str):
+    def __init__(
+        self,
+        excel_path: str,
+        db_path: str,
+        backup_store: Optional[BackupStore] = None,
+        asset_cache_ttl: float = 10.0,
+        asset_cache_size: int = 4096,
+        import_on_init: bool = True,
+        defer_init: bool = False
+    ):
         """
-        Initialize with manual synchronization only
+        Initialize and import the workbook. Later imports/exports are triggered
+        explicitly, by the sync worker or by a workbook watcher.
+
+        Every process sharing ``db_path`` serializes workbook imports/exports on
+        a lock file next to the database. With ``import_on_init=False`` the
+        instance attaches to the database as imported by another process (it
+        still waits for an import in progress to finish). With
+        ``defer_init=True`` nothing touches the database until initialize().
         """
         self.excel_path = os.path.abspath(excel_path)
         self.db_path = os.path.abspath(db_path)
@@ -23,21 +263,63 @@ class ExcelSQLiteSync:
         # Ensure directories exist
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
+        self.backups = backup_store or BackupStore(self.backup_dir)
+
+        self.pool = get_pool(self.db_path)
+
+        # Serializes imports and exports touching the workbook, across threads
+        # and across worker processes using the same database
+        self.workbook_lock = InterProcessLock(f"{self.db_path}.workbook.lock")
 
-        # Initial import from Excel to SQLite
-        self.excel_to_sqlite()
+        # asset_tag -> versioned lookup result; writes in this process evict,
+        # and a hit is only served while its version is still the stored one
+        self.asset_cache = TTLCache(maxsize=asset_cache_size, ttl=asset_cache_ttl)
+        # Bumped with every eviction, so a lookup that read its rows before a
+        # write doesn't cache them after the write's eviction
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+
+        self._filter_counts: Dict[tuple, int] = {}
+        self._filter_lock = threading.Lock()
+        self.search_tokenizer: Optional[str] = None
+
+        if not defer_init:
+            self.initialize(import_workbook=import_on_init)
+
+    def initialize(self, import_workbook: bool = True) -> bool:
+        """
+        Set up the database and (unless attaching) import the workbook if it changed.
+
+        Returns whether the database holds an imported workbook: an attaching
+        process can get here before the importing one takes the workbook lock,
+        and should not serve the empty database (call again until True).
+        """
+        with self.pool.connection() as conn:
+            self.search_tokenizer = self._detect_search_tokenizer(conn)
+
+        # Held across schema setup and the initial import, so a process
+        # starting alongside an importing one sees either none or all of it
+        with self.workbook_lock:
+            with self.pool.connection() as conn:
+                self._ensure_catalog(conn)
+                imported = self._get_meta(conn, "workbook_sha256") is not None
+            if import_workbook:
+                # A no-op when this workbook was already imported (here or by another process)
+                self.excel_to_sqlite()
+                return True
+            if not imported:
+                logger.info(f"Attached to {self.db_path} before any workbook import")
+            return imported
 
     def _create_backup(self, file_path: str) -> str:
-        """Create timestamped backup"""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.basename(file_path)
-        backup_path = os.path.join(self.backup_dir, f"{filename}.bak_{timestamp}")
-        
-        if os.path.exists(file_path):
-            shutil.copy2(file_path, backup_path)
-            logger.info(f"Created backup at {backup_path}")
-            return backup_path
-        return ""
+        """Snapshot a file into the deduplicated backup store; returns the stored object path"""
+        if file_path == self.db_path:
+            snapshot = self.backups.snapshot_sqlite(file_path)
+        else:
+            snapshot = self.backups.snapshot_file(file_path)
+        if snapshot is None:
+            return ""
+        return snapshot["object_path"]
 
     def _ensure_file_writable(self, file_path: str):
         """Check file permissions"""
@@ -46,105 +328,936 @@ class ExcelSQLiteSync:
         elif not os.access(file_path, os.W_OK):
             raise PermissionError(f"No write permissions for {file_path}")
 
-    def excel_to_sqlite(self):
-        """Import Excel to SQLite with proper column name conversion"""
-        try:
-            if not os.path.exists(self.excel_path):
-                raise FileNotFoundError(f"Excel file not found at {self.excel_path}")
+    def _ensure_catalog(self, conn: sqlite3.Connection):
+        """Create the table catalog and the global asset_tag lookup table"""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+                table_name TEXT PRIMARY KEY,
+                sheet_name TEXT NOT NULL,
+                columns TEXT NOT NULL,
+                has_asset_tag INTEGER NOT NULL DEFAULT 0,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._ensure_column(conn, CATALOG_TABLE, "content_hash", "TEXT")
+        self._ensure_column(conn, CATALOG_TABLE, "search_columns", "TEXT")
+        self._ensure_column(conn, CATALOG_TABLE, "column_types", "TEXT")
+        self._ensure_column(conn, CATALOG_TABLE, "issues", "TEXT")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {TAG_INDEX_TABLE} (
+                asset_tag TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                PRIMARY KEY (asset_tag, table_name)
+            ) WITHOUT ROWID
+        """)
+        # Hash of each row as last imported from Excel, for incremental imports
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ROW_HASH_TABLE} (
+                table_name TEXT NOT NULL,
+                asset_tag TEXT NOT NULL,
+                row_hash INTEGER NOT NULL,
+                PRIMARY KEY (table_name, asset_tag)
+            ) WITHOUT ROWID
+        """)
+        # Secondary indexes created for listing filters, recreated after rebuilds
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {COLUMN_INDEX_TABLE} (
+                table_name TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                PRIMARY KEY (table_name, column_name)
+            ) WITHOUT ROWID
+        """)
+        # Rows edited in SQLite since the last export to Excel
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Per-asset version, bumped whenever an import or reassignment touches the tag
+        has_versions = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (VERSION_TABLE,)
+        ).fetchone() is not None
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                asset_tag TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        """)
+        if not has_versions:
+            self._bump_versions(conn, f"SELECT DISTINCT asset_tag FROM {TAG_INDEX_TABLE}")
+        # Asset counts per dimension value, kept in step with every row change
+        has_summary = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SUMMARY_TABLE,)
+        ).fetchone() is not None
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+                dimension TEXT NOT NULL,
+                value TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (dimension, value, table_name)
+            ) WITHOUT ROWID
+        """)
+        if not has_summary:
+            for table, columns in conn.execute(f"SELECT table_name, columns FROM {CATALOG_TABLE}").fetchall():
+                self._rebuild_summary(conn, table, json.loads(columns))
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SYNC_META_TABLE} (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
 
-            backup_path = self._create_backup(self.db_path)
-            xls = pd.ExcelFile(self.excel_path)
-            
-            with sqlite3.connect(self.db_path) as conn:
-                for sheet in xls.sheet_names:
-                    df = pd.read_excel(self.excel_path, sheet_name=sheet)
-                    
-                    # Convert column names to valid database fields
-                    df.columns = [
-                        col.strip()                     # Remove whitespace
-                        .lower()                        # Convert to lowercase
-                        .replace(' ', '_')              # Replace spaces with underscores
-                        .replace('-', '_')              # Replace hyphens with underscores
-                        .replace('(', '')               # Remove special characters
-                        .replace(')', '')
-                        .replace('/', '_')
-                        .replace('\\', '_')
-                        .replace('.', '_')
-                        .replace('$', '')
-                        .replace('%', 'percent')
-                        for col in df.columns
-                    ]
-                    
-                    # Ensure no empty column names
-                    df.columns = [f'col_{i}' if col == '' else col for i, col in enumerate(df.columns)]
-                    
-                    # Save to database
-                    df.to_sql(
-                        name=sheet.lower().replace(' ', '_'),
-                        con=conn,
-                        if_exists='replace',
-                        index=False
-                    )
-                    logger.info(f"Imported sheet {sheet} to database")
+    def _ensure_column(self, conn: sqlite3.Connection, table: str, column: str, decl: str):
+        """Add a column to an existing bookkeeping table created by an older version"""
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({_quote_identifier(table)})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {_quote_identifier(table)} ADD COLUMN {column} {decl}")
 
-            return {
-                "message": "Excel data imported to SQLite with standardized column names",
-                "backup_path": backup_path
-            }
-        except Exception as e:
-            logger.error(f"Excel import failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Excel import failed: {str(e)}"
+    def _bump_versions(self, conn: sqlite3.Connection, tags_sql: str, params: tuple = ()):
+        """Advance the version of every tag selected by a query with an asset_tag column"""
+        conn.execute(
+            f"""
+            INSERT INTO {VERSION_TABLE} (asset_tag, version, updated_at)
+            SELECT asset_tag, 1, CURRENT_TIMESTAMP FROM ({tags_sql}) WHERE asset_tag IS NOT NULL
+            ON CONFLICT (asset_tag) DO UPDATE SET
+                version = version + 1,
+                updated_at = excluded.updated_at
+            """,
+            params
+        )
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute(f"SELECT value FROM {SYNC_META_TABLE} WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value: str):
+        conn.execute(
+            f"INSERT OR REPLACE INTO {SYNC_META_TABLE} (key, value) VALUES (?, ?)",
+            (key, value)
+        )
+
+    def _catalog_tables(self, conn: sqlite3.Connection, with_asset_tag: bool = False) -> List[str]:
+        """List imported tables from the catalog"""
+        query = f"SELECT table_name FROM {CATALOG_TABLE}"
+        if with_asset_tag:
+            query += " WHERE has_asset_tag = 1"
+        return [row[0] for row in conn.execute(query + " ORDER BY rowid")]
+
+    def _register_table(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        sheet: str,
+        columns: List[str],
+        content_hash: Optional[str] = None,
+        rebuild_index: bool = True,
+        column_types: Optional[Dict[str, str]] = None,
+        issues: Optional[List[str]] = None
+    ):
+        """Record an imported table in the catalog and (re)build its asset_tag indexes"""
+        has_asset_tag = "asset_tag" in columns
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {_quote_identifier(table)}").fetchone()[0]
+
+        if rebuild_index:
+            self._rebuild_tag_index(conn, table, sheet, has_asset_tag)
+            self._rebuild_column_indexes(conn, table, columns, column_types)
+
+        conn.execute(
+            f"""
+            INSERT INTO {CATALOG_TABLE}
+                (table_name, sheet_name, columns, has_asset_tag, row_count, content_hash,
+                 column_types, issues, imported_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (table_name) DO UPDATE SET
+                sheet_name = excluded.sheet_name,
+                columns = excluded.columns,
+                has_asset_tag = excluded.has_asset_tag,
+                row_count = excluded.row_count,
+                content_hash = excluded.content_hash,
+                column_types = excluded.column_types,
+                issues = excluded.issues,
+                imported_at = excluded.imported_at
+            """,
+            (
+                table, sheet, json.dumps(columns), int(has_asset_tag), row_count, content_hash,
+                json.dumps(column_types) if column_types is not None else None,
+                json.dumps(issues or [])
+            )
+        )
+        if rebuild_index:
+            self._rebuild_search_index(conn, table, columns)
+            self._rebuild_summary(conn, table, columns)
+
+    def _rebuild_tag_index(self, conn: sqlite3.Connection, table: str, sheet: str, has_asset_tag: bool):
+        """Create the asset_tag index on a table and refill its global lookup entries"""
+        # Tags that leave the table change too (they now 404)
+        self._bump_versions(conn, f"SELECT asset_tag FROM {TAG_INDEX_TABLE} WHERE table_name = ?", (table,))
+        conn.execute(f"DELETE FROM {TAG_INDEX_TABLE} WHERE table_name = ?", (table,))
+        if has_asset_tag:
+            index_name = _quote_identifier(f"ux_{table}_asset_tag")
+            try:
+                conn.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} "
+                    f"ON {_quote_identifier(table)} (asset_tag)"
+                )
+            except sqlite3.IntegrityError:
+                # Duplicate tags in the sheet: fall back to a plain index
+                logger.warning(f"Duplicate asset_tag values in sheet {sheet}; using non-unique index")
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote_identifier(f'ix_{table}_asset_tag')} "
+                    f"ON {_quote_identifier(table)} (asset_tag)"
+                )
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO {TAG_INDEX_TABLE} (asset_tag, table_name, row_id)
+                SELECT CAST(asset_tag AS TEXT), ?, rowid FROM {_quote_identifier(table)}
+                WHERE asset_tag IS NOT NULL
+                """,
+                (table,)
+            )
+            self._bump_versions(conn, f"SELECT asset_tag FROM {TAG_INDEX_TABLE} WHERE table_name = ?", (table,))
+
+    def _has_unique_tags(self, conn: sqlite3.Connection, table: str) -> bool:
+        """Whether the table got its unique asset_tag index (sheets with duplicate tags don't)"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (f"ux_{table}_asset_tag",)
+        ).fetchone() is not None
+
+    def _create_column_index(self, conn: sqlite3.Connection, table: str, column: str):
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {_quote_identifier(f'ix_{table}_{column}')} "
+            f"ON {_quote_identifier(table)} ({_quote_identifier(column)})"
+        )
+
+    def _rebuild_column_indexes(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        columns: List[str],
+        column_types: Optional[Dict[str, str]] = None
+    ):
+        """Index the default filter columns, date columns (for range filters) and auto-indexed columns"""
+        wanted = [c for c in DEFAULT_INDEXED_COLUMNS if c in columns]
+        wanted += [c for c, t in (column_types or {}).items() if t == "date" and c not in wanted]
+        wanted += [
+            row[0] for row in conn.execute(
+                f"SELECT column_name FROM {COLUMN_INDEX_TABLE} WHERE table_name = ?", (table,)
+            )
+            if row[0] in columns and row[0] not in wanted
+        ]
+        for column in wanted:
+            self._create_column_index(conn, table, column)
+
+    def _note_filter_use(self, conn: sqlite3.Connection, table: str, column: str):
+        """Count filter uses and index a column once it is filtered on often"""
+        if column in DEFAULT_INDEXED_COLUMNS or column == "asset_tag":
+            return
+        with self._filter_lock:
+            count = self._filter_counts.get((table, column), 0) + 1
+            self._filter_counts[(table, column)] = count
+        if count == AUTO_INDEX_AFTER:
+            logger.info(f"Auto-indexing {table}.{column} for listing filters")
+            self._create_column_index(conn, table, column)
+            conn.execute(
+                f"INSERT OR IGNORE INTO {COLUMN_INDEX_TABLE} (table_name, column_name) VALUES (?, ?)",
+                (table, column)
+            )
+
+    def _detect_search_tokenizer(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Best FTS5 tokenizer this SQLite build offers (trigram needs 3.34+)"""
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                conn.execute(f"CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='{tokenizer}')")
+                conn.execute("DROP TABLE temp._fts_probe")
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        logger.warning("SQLite has no FTS5 support; asset search is disabled")
+        return None
+
+    def _search_columns(self, conn: sqlite3.Connection, table: str) -> List[str]:
+        row = conn.execute(
+            f"SELECT search_columns FROM {CATALOG_TABLE} WHERE table_name = ?", (table,)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def _rebuild_search_index(self, conn: sqlite3.Connection, table: str, columns: List[str]):
+        """(Re)create the FTS5 index over the table's text columns"""
+        conn.execute(f"DROP TABLE IF EXISTS {_search_table(table)}")
+        if self.search_tokenizer is None:
+            return
+        # Text columns are those holding at least one string value
+        text_flags = conn.execute(
+            "SELECT " + ", ".join(f"MAX(typeof({_quote_identifier(c)}) = 'text')" for c in columns)
+            + f" FROM {_quote_identifier(table)}"
+        ).fetchone()
+        search_columns = [c for c, is_text in zip(columns, text_flags) if is_text]
+        conn.execute(
+            f"UPDATE {CATALOG_TABLE} SET search_columns = ? WHERE table_name = ?",
+            (json.dumps(search_columns), table)
+        )
+        if not search_columns:
+            return
+
+        tokenize = "trigram" if self.search_tokenizer == "trigram" else "unicode61"
+        extra = "" if tokenize == "trigram" else ", prefix='2 3'"
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {_search_table(table)} USING fts5(body, tokenize='{tokenize}'{extra})"
+        )
+        conn.execute(
+            f"INSERT INTO {_search_table(table)} (rowid, body) "
+            f"SELECT rowid, {_search_body(search_columns)} FROM {_quote_identifier(table)}"
+        )
+
+    def _summary_expressions(self, conn: sqlite3.Connection, table: str, columns: Optional[List[str]] = None) -> Dict[str, str]:
+        if columns is None:
+            columns = (self._catalog_entry(conn, table) or {}).get("columns", [])
+        if "asset_tag" not in columns:
+            return {}
+        return {
+            dimension: expression
+            for dimension, (required, expression) in SUMMARY_DIMENSIONS.items()
+            if all(c in columns for c in required)
+        }
+
+    def _adjust_summary(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        row_ids_sql: Optional[str],
+        params: tuple = (),
+        sign: int = 1,
+        columns: Optional[List[str]] = None
+    ):
+        """
+        Add (sign=1) or remove (sign=-1) the summary counts of the rows whose
+        rowids the subquery selects (every row when it is None). Call with -1
+        before changing rows and with 1 afterwards.
+        """
+        expressions = self._summary_expressions(conn, table, columns)
+        if not expressions:
+            return
+        where = f"WHERE rowid IN ({row_ids_sql})" if row_ids_sql else ""
+        selects = [
+            f"SELECT ? AS dimension, COALESCE(CAST({expression} AS TEXT), '') AS value, {sign} * COUNT(*) AS n "
+            f"FROM {_quote_identifier(table)} {where} GROUP BY 2"
+            for expression in expressions.values()
+        ]
+        select_params = []
+        for dimension in expressions:
+            select_params.append(dimension)
+            select_params.extend(params if row_ids_sql else ())
+        conn.execute(
+            f"""
+            INSERT INTO {SUMMARY_TABLE} (dimension, value, table_name, count)
+            SELECT dimension, value, ?, n FROM ({" UNION ALL ".join(selects)}) WHERE true
+            ON CONFLICT (dimension, value, table_name) DO UPDATE SET count = count + excluded.count
+            """,
+            (table, *select_params)
+        )
+        if sign < 0:
+            conn.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE table_name = ? AND count <= 0", (table,))
+
+    def _rebuild_summary(self, conn: sqlite3.Connection, table: str, columns: List[str]):
+        """Recount a table's summary rows from scratch (after a full rebuild)"""
+        conn.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE table_name = ?", (table,))
+        self._adjust_summary(conn, table, None, columns=columns)
+
+    def _refresh_search_rows(self, conn: sqlite3.Connection, table: str, row_ids_sql: str, params: tuple = ()):
+        """Re-index the rows whose rowids the given subquery selects"""
+        search_columns = self._search_columns(conn, table)
+        if not search_columns or self.search_tokenizer is None:
+            return
+        conn.execute(f"DELETE FROM {_search_table(table)} WHERE rowid IN ({row_ids_sql})", params)
+        conn.execute(
+            f"INSERT INTO {_search_table(table)} (rowid, body) "
+            f"SELECT rowid, {_search_body(search_columns)} FROM {_quote_identifier(table)} "
+            f"WHERE rowid IN ({row_ids_sql})",
+            params
+        )
+
+    def _catalog_entry(self, conn: sqlite3.Connection, table: str) -> Optional[Dict]:
+        row = conn.execute(
+            f"SELECT columns, content_hash, column_types FROM {CATALOG_TABLE} WHERE table_name = ?",
+            (table,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "columns": json.loads(row[0]),
+            "content_hash": row[1],
+            "column_types": json.loads(row[2]) if row[2] else None,
+        }
+
+    def _column_types(self, conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+        entry = self._catalog_entry(conn, table)
+        return (entry or {}).get("column_types") or {}
+
+    def _normalize_updates(self, column_types: Dict[str, str], updates: Dict) -> Dict:
+        """Store dates written through the API in the same ISO form as imported ones"""
+        return {
+            k: normalize_date(v) if column_types.get(k) == "date" else v
+            for k, v in updates.items()
+        }
+
+    def _stage_sheet(self, conn: sqlite3.Connection, ws) -> Optional[Dict]:
+        """
+        Stream a worksheet into the staging table in CHUNK_SIZE batches.
+
+        Each staged row carries its hash and asset_tag key; only one chunk is
+        held in memory at a time. Column values are profiled on the way in to
+        infer the sheet's column types (see schema_inference).
+        """
+        header, rows = _iter_sheet(ws)
+        if not header:
+            return None
+        columns = _unique_columns(header)
+        has_asset_tag = "asset_tag" in columns
+        tag_pos = columns.index("asset_tag") if has_asset_tag else None
+
+        conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        conn.execute(
+            f"CREATE TABLE {STAGING_TABLE} ("
+            + ", ".join(_quote_identifier(c) for c in columns)
+            + ", __row_hash INTEGER, __key TEXT, __op TEXT)"
+        )
+        insert_sql = (
+            f"INSERT INTO {STAGING_TABLE} VALUES ("
+            + ", ".join("?" for _ in columns) + ", ?, ?, NULL)"
+        )
+
+        digest = hashlib.sha256(json.dumps(columns).encode())
+        profiles = [ColumnProfile() for _ in columns]
+        row_count = 0
+        chunk = []
+        for raw in rows:
+            for profile, value in zip(profiles, raw):
+                profile.add(value)
+            values = [_sql_value(v) for v in raw]
+            row_digest = _row_hash(values)
+            digest.update(row_digest)
+            key = None
+            if has_asset_tag and values[tag_pos] is not None:
+                key = str(values[tag_pos])
+            chunk.append(values + [int.from_bytes(row_digest, "big", signed=True), key])
+            if len(chunk) >= CHUNK_SIZE:
+                conn.executemany(insert_sql, chunk)
+                row_count += len(chunk)
+                chunk = []
+        if chunk:
+            conn.executemany(insert_sql, chunk)
+            row_count += len(chunk)
+
+        column_types, issues = infer_schema(columns, profiles, row_count)
+        # Date columns typed in as text ("04/03/2021") get the same ISO form as date cells
+        conn.create_function("_normalize_date", 1, normalize_date, deterministic=True)
+        for column in [c for c in columns if column_types[c] == "date"]:
+            quoted = _quote_identifier(column)
+            conn.execute(
+                f"UPDATE {STAGING_TABLE} SET {quoted} = _normalize_date({quoted}) WHERE typeof({quoted}) = 'text'"
+            )
+
+        keyed = False
+        if has_asset_tag:
+            conn.execute(f"CREATE INDEX {STAGING_TABLE}_key ON {STAGING_TABLE} (__key)")
+            duplicates = conn.execute(
+                f"""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM {STAGING_TABLE} WHERE __key IS NOT NULL GROUP BY __key HAVING COUNT(*) > 1
+                )
+                """
+            ).fetchone()[0]
+            if duplicates:
+                issues.append(f"asset_tag: {duplicates} tag(s) used on more than one row")
+            keyed = not duplicates and not profiles[tag_pos].nulls
+
+        return {
+            "columns": columns,
+            "column_types": column_types,
+            "issues": issues,
+            "content_hash": digest.hexdigest(),
+            "rows": row_count,
+            "keyed": keyed,
+        }
+
+    def _import_sheet_full(self, conn: sqlite3.Connection, table: str, sheet: str, staged: Dict) -> Dict:
+        """Rebuild the table from the staged sheet and swap it in"""
+        columns = staged["columns"]
+        column_list = ", ".join(_quote_identifier(c) for c in columns)
+        new_table = _quote_identifier(f"{table}__new")
+        # Typed columns; a clean asset_tag is NOT NULL (and unique via its index)
+        definitions = ", ".join(
+            column_definition(
+                _quote_identifier(c), staged["column_types"][c], not_null=c == "asset_tag" and staged["keyed"]
             )
+            for c in columns
+        )
+
+        conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+        conn.execute(f"CREATE TABLE {new_table} ({definitions})")
+        conn.execute(
+            f"INSERT INTO {new_table} ({column_list}) "
+            f"SELECT {column_list} FROM {STAGING_TABLE} ORDER BY rowid"
+        )
+        conn.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {_quote_identifier(table)}")
+
+        self._register_table(
+            conn, table, sheet, columns, staged["content_hash"],
+            column_types=staged["column_types"], issues=staged["issues"]
+        )
+        # Rowids are reassigned, and Excel is now the source of truth for this sheet
+        conn.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE table_name = ?", (table,))
+        conn.execute(f"DELETE FROM {ROW_HASH_TABLE} WHERE table_name = ?", (table,))
+        if staged["keyed"]:
+            conn.execute(
+                f"""
+                INSERT INTO {ROW_HASH_TABLE} (table_name, asset_tag, row_hash)
+                SELECT ?, __key, __row_hash FROM {STAGING_TABLE}
+                """,
+                (table,)
+            )
+        return {"mode": "full", "rows": staged["rows"], "issues": staged["issues"]}
+
+    def _import_sheet_incremental(self, conn: sqlite3.Connection, table: str, sheet: str, staged: Dict) -> Dict:
+        """Apply only the inserted/updated/deleted rows (keyed on asset_tag)"""
+        quoted_table = _quote_identifier(table)
+        columns = staged["columns"]
+        column_list = ", ".join(_quote_identifier(c) for c in columns)
+
+        # Classify staged rows against the hashes recorded at the last import
+        conn.execute(
+            f"""
+            UPDATE {STAGING_TABLE} SET __op = 'insert'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {ROW_HASH_TABLE} h
+                WHERE h.table_name = ? AND h.asset_tag = {STAGING_TABLE}.__key
+            )
+            """,
+            (table,)
+        )
+        conn.execute(
+            f"""
+            UPDATE {STAGING_TABLE} SET __op = 'update'
+            WHERE EXISTS (
+                SELECT 1 FROM {ROW_HASH_TABLE} h
+                WHERE h.table_name = ? AND h.asset_tag = {STAGING_TABLE}.__key
+                  AND h.row_hash != {STAGING_TABLE}.__row_hash
+            )
+            """,
+            (table,)
+        )
+        gone = f"""
+            FROM {ROW_HASH_TABLE} h
+            WHERE h.table_name = ?
+              AND NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} s WHERE s.__key = h.asset_tag)
+        """
+        deleted = conn.execute(f"SELECT COUNT(*) {gone}", (table,)).fetchone()[0]
+        if deleted:
+            gone_rowids = f"""
+                SELECT i.row_id FROM {TAG_INDEX_TABLE} i
+                WHERE i.table_name = ? AND i.asset_tag IN (SELECT h.asset_tag {gone})
+            """
+            self._bump_versions(conn, f"SELECT h.asset_tag {gone}", (table,))
+            self._adjust_summary(conn, table, gone_rowids, (table, table), sign=-1, columns=columns)
+            conn.execute(
+                f"DELETE FROM {quoted_table} WHERE rowid IN ({gone_rowids})",
+                (table, table)
+            )
+            # After the table DELETE (before the tag index forgets the rowids) the
+            # refresh only drops their search entries: there is nothing to re-index
+            self._refresh_search_rows(conn, table, gone_rowids, (table, table))
+            conn.execute(
+                f"DELETE FROM {TAG_INDEX_TABLE} WHERE table_name = ? AND asset_tag IN (SELECT h.asset_tag {gone})",
+                (table, table)
+            )
+            conn.execute(
+                f"DELETE FROM {ROW_HASH_TABLE} WHERE table_name = ? AND asset_tag IN (SELECT h.asset_tag {gone})",
+                (table, table)
+            )
+
+        changed_rowids = f"""
+            SELECT i.row_id FROM {STAGING_TABLE} s
+            JOIN {TAG_INDEX_TABLE} i ON i.table_name = ? AND i.asset_tag = s.__key
+            WHERE s.__op IS NOT NULL
+        """
+        # Before the update (and before inserts get index entries), this is the updated rows' old state
+        self._adjust_summary(conn, table, changed_rowids, (table,), sign=-1, columns=columns)
+
+        set_clause = ", ".join(f"{_quote_identifier(c)} = s.{_quote_identifier(c)}" for c in columns)
+        updated = conn.execute(
+            f"""
+            UPDATE {quoted_table} SET {set_clause}
+            FROM {STAGING_TABLE} s
+            JOIN {TAG_INDEX_TABLE} i ON i.table_name = ? AND i.asset_tag = s.__key
+            WHERE s.__op = 'update' AND {quoted_table}.rowid = i.row_id
+            """,
+            (table,)
+        ).rowcount
+
+        placeholders = ", ".join("?" for _ in columns)
+        inserted = 0
+        for row in conn.execute(
+            f"SELECT {column_list}, __key FROM {STAGING_TABLE} WHERE __op = 'insert' ORDER BY rowid"
+        ):
+            cursor = conn.execute(
+                f"INSERT INTO {quoted_table} ({column_list}) VALUES ({placeholders})",
+                row[:-1]
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO {TAG_INDEX_TABLE} (asset_tag, table_name, row_id) VALUES (?, ?, ?)",
+                (row[-1], table, cursor.lastrowid)
+            )
+            inserted += 1
+
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {ROW_HASH_TABLE} (table_name, asset_tag, row_hash)
+            SELECT ?, __key, __row_hash FROM {STAGING_TABLE} WHERE __op IS NOT NULL
+            """,
+            (table,)
+        )
+        self._bump_versions(conn, f"SELECT __key AS asset_tag FROM {STAGING_TABLE} WHERE __op IS NOT NULL")
+        if inserted or updated:
+            self._refresh_search_rows(conn, table, changed_rowids, (table,))
+            self._adjust_summary(conn, table, changed_rowids, (table,), columns=columns)
+
+        self._register_table(
+            conn, table, sheet, columns, staged["content_hash"], rebuild_index=False,
+            column_types=staged["column_types"], issues=staged["issues"]
+        )
+        return {
+            "mode": "incremental",
+            "rows": staged["rows"],
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "issues": staged["issues"],
+        }
+
+    def _same_storage(self, old_types: Optional[Dict[str, str]], new_types: Dict[str, str]) -> bool:
+        """Whether a table created for old_types can take rows typed as new_types in place"""
+        if old_types is None:
+            return False  # Created before typed imports; rebuild once
+        return {c: AFFINITIES[t] for c, t in old_types.items()} == {c: AFFINITIES[t] for c, t in new_types.items()}
+
+    def _import_sheet(self, conn: sqlite3.Connection, ws, incremental: bool) -> Dict:
+        """Import one sheet, skipping it or diffing it against the last import when possible"""
+        sheet = ws.title
+        table = sheet.lower().replace(' ', '_')
+        staged = self._stage_sheet(conn, ws)
+        if staged is None:
+            return {"mode": "empty", "rows": 0}
 
-    def sqlite_to_excel(self):
-        """Export SQLite to Excel"""
         try:
-            self._ensure_file_writable(self.excel_path)
-            backup_path = self._create_backup(self.excel_path)
-            
-            with sqlite3.connect(self.db_path) as conn:
+            entry = self._catalog_entry(conn, table)
+            if incremental and entry is not None:
+                if entry["content_hash"] == staged["content_hash"]:
+                    return {"mode": "unchanged", "rows": staged["rows"]}
+                if (
+                    staged["keyed"]
+                    and entry["columns"] == staged["columns"]
+                    and entry["content_hash"] is not None
+                    and self._same_storage(entry["column_types"], staged["column_types"])
+                ):
+                    return self._import_sheet_incremental(conn, table, sheet, staged)
+            return self._import_sheet_full(conn, table, sheet, staged)
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+
+    def excel_to_sqlite(self, incremental: bool = True):
+        """
+        Import Excel to SQLite with proper column name conversion.
+
+        Sheets are streamed row by row (openpyxl read-only mode) into SQLite in
+        chunks, so memory stays flat regardless of workbook size. In incremental
+        mode an unchanged workbook is skipped outright, unchanged sheets are
+        skipped, and sheets keyed by a unique asset_tag only get their
+        inserted/updated/deleted rows applied (so unexported reassign_asset edits
+        to rows untouched in Excel survive). Other sheets are rebuilt.
+        """
+        with self.workbook_lock:
+            started = time.perf_counter()
+            try:
+                if not os.path.exists(self.excel_path):
+                    raise FileNotFoundError(f"Excel file not found at {self.excel_path}")
+
+                # mtime/size first, so a restart with an unchanged workbook doesn't
+                # even hash it; a touched but identical file is caught by the hash
+                signature = _file_signature(self.excel_path)
+                with self.pool.connection() as conn:
+                    self._ensure_catalog(conn)
+                    current = incremental and self._get_meta(conn, "workbook_signature") == signature
+                workbook_hash = None
+                if not current:
+                    workbook_hash = _file_sha256(self.excel_path)
+                    with self.pool.connection() as conn:
+                        current = incremental and self._get_meta(conn, "workbook_sha256") == workbook_hash
+                        if current:
+                            self._set_meta(conn, "workbook_signature", signature)
+                if current:
+                    logger.info("Excel workbook unchanged since last import")
+                    IMPORT_SECONDS.observe(time.perf_counter() - started, outcome="unchanged")
+                    return {
+                        "message": "Excel workbook unchanged, nothing imported",
+                        "backup_path": "",
+                        "sheets": {}
+                    }
+                backup_path = self._create_backup(self.db_path)
+
+                # Imported here rather than at module level: openpyxl (and numpy,
+                # which it pulls in) is only needed on the sync paths
+                from openpyxl import load_workbook
+
+                changes = {}
+                wb = load_workbook(self.excel_path, read_only=True, data_only=True)
+                try:
+                    with self.pool.connection() as conn:
+                        for ws in wb.worksheets:
+                            changes[ws.title] = self._import_sheet(conn, ws, incremental)
+                            logger.info(f"Imported sheet {ws.title} to database: {changes[ws.title]}")
+                            for issue in changes[ws.title].get("issues", []):
+                                logger.warning(f"Sheet {ws.title} does not conform: {issue}")
+                            SHEET_ROWS.set(changes[ws.title]["rows"], sheet=ws.title, direction="import")
+                            for change in ("inserted", "updated", "deleted"):
+                                if changes[ws.title].get(change):
+                                    SHEET_ROW_CHANGES.inc(changes[ws.title][change], sheet=ws.title, change=change)
+                        self._set_meta(conn, "workbook_sha256", workbook_hash)
+                        self._set_meta(conn, "workbook_signature", signature)
+                finally:
+                    wb.close()
+                self._evict_assets()
+                IMPORT_SECONDS.observe(time.perf_counter() - started, outcome="imported")
+
+                return {
+                    "message": "Excel data imported to SQLite with standardized column names",
+                    "backup_path": backup_path,
+                    "sheets": changes
+                }
+            except Exception as e:
+                IMPORT_SECONDS.observe(time.perf_counter() - started, outcome="failed")
+                logger.error(f"Excel import failed: {str(e)}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Excel import failed: {str(e)}"
+                )
+
+    def _patch_workbook(
+        self,
+        conn: sqlite3.Connection,
+        changes: List[tuple],
+        progress: Optional[Callable[[str], None]] = None
+    ) -> Optional[Dict]:
+        """
+        Write changed rows into the existing workbook.
+
+        The workbook is never loaded whole: the affected sheets' XML is
+        streamed once to find the changed rows and once more to rewrite them,
+        and every other part of the file is copied as is (see xlsx_patch).
+        Returns per-sheet patch counts, or None when rows can't be matched up
+        by tag (duplicate or missing tags, a sheet or header that no longer
+        matches the catalog) and the workbook needs a full export.
+        """
+        from xlsx_patch import XlsxFile
+
+        dirty: Dict[str, set] = {}
+        for table_name, row_id in changes:
+            dirty.setdefault(table_name, set()).add(row_id)
+
+        # sheet title -> Excel row -> column number -> value
+        edits: Dict[str, Dict[int, Dict[int, object]]] = {}
+        patched = {}
+        with XlsxFile(self.excel_path) as workbook:
+            for position, (table_name, row_ids) in enumerate(dirty.items(), start=1):
+                if progress:
+                    progress(f"Patching {table_name} ({position}/{len(dirty)})")
+                entry = conn.execute(
+                    f"SELECT sheet_name, columns, column_types FROM {CATALOG_TABLE} "
+                    f"WHERE table_name = ? AND has_asset_tag = 1",
+                    (table_name,)
+                ).fetchone()
+                if entry is None or not self._has_unique_tags(conn, table_name):
+                    return None
+                sheet_name, columns = entry[0], json.loads(entry[1])
+                date_columns = {c for c, t in json.loads(entry[2] or "{}").items() if t == "date"}
+                title = table_name if table_name in workbook.sheetnames else sheet_name
+                if title not in workbook.sheetnames:
+                    return None
+
+                header = {
+                    _normalize_column(v): index
+                    for index, v in sorted(workbook.read_row(title, 1).items(), reverse=True)
+                    if v is not None
+                }
+                if any(col not in header for col in columns):
+                    return None
+                col_positions = {col: header[col] for col in columns}
+                tag_col = col_positions["asset_tag"]
+
+                # Cursor-local factory: the caller may fall back to a full export on this connection
                 cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = [table[0] for table in cursor.fetchall()]
-                
-                with pd.ExcelWriter(self.excel_path, engine='openpyxl') as writer:
-                    for table in tables:
-                        df = pd.read_sql(f"SELECT * FROM {table}", conn)
-                        df.to_excel(writer, sheet_name=table, index=False)
-                        logger.info(f"Exported table {table} to Excel")
-
-            return {
-                "message": "SQLite data exported to Excel",
-                "backup_path": backup_path
-            }
-        except Exception as e:
-            logger.error(f"Excel export failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Excel export failed: {str(e)}"
-            )
+                cursor.row_factory = sqlite3.Row
+                changed = {}
+                for row_id in row_ids:
+                    row = cursor.execute(
+                        f"SELECT * FROM {_quote_identifier(table_name)} WHERE rowid = ?", (row_id,)
+                    ).fetchone()
+                    if row is None:
+                        continue  # Deleted since it was changed
+                    if row["asset_tag"] is None:
+                        return None
+                    changed[str(row["asset_tag"])] = row
+
+                # A tag must lead to exactly one Excel row, or the wrong row gets patched
+                tag_rows = workbook.find_rows(title, tag_col, changed, key=lambda v: str(_sql_value(v)))
+                sheet_edits = edits.setdefault(title, {})
+                count = 0
+                for tag, row in changed.items():
+                    if len(tag_rows.get(tag, ())) != 1:
+                        return None
+                    sheet_edits[tag_rows[tag][0]] = {
+                        col_positions[col]: to_excel_date(row[col]) if col in date_columns else row[col]
+                        for col in columns
+                    }
+                    count += 1
+                patched[table_name] = count
+
+            tmp_path = f"{self.excel_path}.tmp"
+            if not workbook.patch(tmp_path, {t: rows for t, rows in edits.items() if rows}):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return None
+        os.replace(tmp_path, self.excel_path)
+        return patched
+
+    def _export_full(self, conn: sqlite3.Connection, progress: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Rewrite the whole workbook from the catalogued tables.
+
+        Uses openpyxl's write-only mode fed straight from a SQLite cursor, and
+        swaps the finished file into place so readers never see a partial file.
+        """
+        from openpyxl import Workbook
+
+        exported = {}
+        wb = Workbook(write_only=True)
+        tables = self._catalog_tables(conn)
+        for position, table in enumerate(tables, start=1):
+            if progress:
+                progress(f"Exporting {table} ({position}/{len(tables)})")
+            ws = wb.create_sheet(title=table)
+            cursor = conn.execute(f"SELECT * FROM {_quote_identifier(table)}")
+            header = [d[0] for d in cursor.description]
+            ws.append(header)
+            # Dates are stored as ISO text; write them back as real date cells
+            column_types = self._column_types(conn, table)
+            date_positions = [i for i, c in enumerate(header) if column_types.get(c) == "date"]
+            count = 0
+            while rows := cursor.fetchmany(CHUNK_SIZE):
+                for row in rows:
+                    row = list(row)
+                    for i in date_positions:
+                        row[i] = to_excel_date(row[i])
+                    ws.append(row)
+                count += len(rows)
+            exported[table] = count
+            logger.info(f"Exported table {table} to Excel")
+
+        tmp_path = f"{self.excel_path}.tmp"
+        wb.save(tmp_path)
+        os.replace(tmp_path, self.excel_path)
+        return exported
+
+    def sqlite_to_excel(self, incremental: bool = True, progress: Optional[Callable[[str], None]] = None):
+        """
+        Export SQLite to Excel.
+
+        ``progress`` is called with a short status line as each sheet is written.
+
+        In incremental mode only rows logged as changed (by reassign_asset)
+        since the last export are patched into the existing workbook; with no
+        pending changes the export is skipped. Falls back to a full rewrite when
+        the workbook is missing or no longer lines up with the database.
+        """
+        with self.workbook_lock:
+            started = time.perf_counter()
+            try:
+                self._ensure_file_writable(self.excel_path)
+            
+                with self.pool.connection() as conn:
+                    changes = conn.execute(
+                        f"SELECT id, table_name, row_id FROM {CHANGE_LOG_TABLE} ORDER BY id"
+                    ).fetchall()
+                    last_change = changes[-1][0] if changes else 0
+                    has_workbook = os.path.getsize(self.excel_path) > 0
+
+                    if incremental and has_workbook and not changes:
+                        EXPORT_SECONDS.observe(time.perf_counter() - started, mode="unchanged")
+                        return {
+                            "message": "No changes to export",
+                            "backup_path": "",
+                            "mode": "unchanged",
+                            "rows": {}
+                        }
+
+                    backup_path = self._create_backup(self.excel_path)
+                    rows = None
+                    if incremental and has_workbook:
+                        rows = self._patch_workbook(conn, [(t, r) for _, t, r in changes], progress)
+                        if rows is None:
+                            logger.info("Workbook does not match database layout; doing a full export")
+                    mode = "incremental" if rows is not None else "full"
+                    if rows is None:
+                        rows = self._export_full(conn, progress)
+
+                    conn.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE id <= ?", (last_change,))
+                    # The workbook now mirrors the database; no need to re-import it
+                    self._set_meta(conn, "workbook_sha256", _file_sha256(self.excel_path))
+                    self._set_meta(conn, "workbook_signature", _file_signature(self.excel_path))
+
+                EXPORT_SECONDS.observe(time.perf_counter() - started, mode=mode)
+                for table_name, count in rows.items():
+                    SHEET_ROWS.set(count, sheet=table_name, direction="export")
+                return {
+                    "message": "SQLite data exported to Excel",
+                    "backup_path": backup_path,
+                    "mode": mode,
+                    "rows": rows
+                }
+            except Exception as e:
+                EXPORT_SECONDS.observe(time.perf_counter() - started, mode="failed")
+                logger.error(f"Excel export failed: {str(e)}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Excel export failed: {str(e)}"
+                )
 
     def get_asset_by_tag(self, asset_tag: str) -> List[Dict]:
         """Get asset details by tag"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             conn.row_factory = sqlite3.Row  # Enable column access by name
             cursor = conn.cursor()
             
-            # Find all tables containing asset_tag
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name IN (
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND sql LIKE '%asset_tag%'
-                )
-            """)
+            # Resolve tag -> (table, rowid) through the global index
+            cursor.execute(
+                f"SELECT table_name, row_id FROM {TAG_INDEX_TABLE} WHERE asset_tag = ?",
+                (asset_tag,)
+            )
             
             assets = []
-            for table in cursor.fetchall():
-                table_name = table[0]
-                cursor.execute(f"SELECT * FROM {table_name} WHERE asset_tag = ?", (asset_tag,))
+            for table_name, row_id in cursor.fetchall():
+                cursor.execute(
+                    f"SELECT * FROM {_quote_identifier(table_name)} WHERE rowid = ?",
+                    (row_id,)
+                )
                 result = cursor.fetchone()
                 if result:
                     asset_data = dict(result)
@@ -153,35 +1266,501 @@ class ExcelSQLiteSync:
             
             return assets
 
+    def _evict_assets(self, asset_tags: Optional[Collection[str]] = None):
+        """Drop cached lookups of the tags (all of them if None); call after the write commits"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            if asset_tags is None:
+                self.asset_cache.clear()
+            for tag in asset_tags or ():
+                self.asset_cache.invalidate(tag)
+
+    def _cache_asset(self, asset_tag: str, entry: Dict, generation: int):
+        """Cache a lookup unless something was evicted since it started (at ``generation``)"""
+        with self._cache_lock:
+            if self._cache_generation == generation:
+                self.asset_cache.set(asset_tag, entry)
+
+    def get_versioned_asset(self, asset_tag: str, known_etags: Collection[str] = ()) -> Optional[Dict]:
+        """
+        Assets for a tag with their version: {"version", "etag", "last_modified", "assets"}.
+
+        When the current ETag is in ``known_etags`` (the client's If-None-Match)
+        the rows are not read and "assets" is None. Returns None for tags that
+        were never imported.
+        """
+        generation = self._cache_generation
+        with self.pool.connection() as conn:
+            # One read transaction, so the version and the rows (read through the
+            # same pooled connection) come from one snapshot and can be cached together
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            row = conn.execute(
+                f"SELECT version, updated_at FROM {VERSION_TABLE} WHERE asset_tag = ?", (asset_tag,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = _version_info(*row)
+            if entry["etag"] in known_etags or "*" in known_etags:
+                return {**entry, "assets": None}
+            # The version is read on every call, so a cached lookup is never
+            # served after a write (in any process) has moved it on
+            cached = self.asset_cache.get(asset_tag)
+            if cached is not None and cached["etag"] == entry["etag"]:
+                return cached
+            entry["assets"] = self.get_asset_by_tag(asset_tag)
+        if entry["assets"]:
+            self._cache_asset(asset_tag, entry, generation)
+        return entry
+
     def reassign_asset(self, asset_tag: str, updates: Dict) -> bool:
         """Reassign asset with given updates"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             
             # Find tables containing asset_tag
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name IN (
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND sql LIKE '%asset_tag%'
-                )
-            """)
+            cursor.execute(
+                f"SELECT table_name, row_id FROM {TAG_INDEX_TABLE} WHERE asset_tag = ?",
+                (asset_tag,)
+            )
             
             updated = False
-            for table in cursor.fetchall():
-                table_name = table[0]
+            for table_name, row_id in cursor.fetchall():
+                updates = self._normalize_updates(self._column_types(conn, table_name), updates)
                 # Build update query
-                set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
+                set_clause = ", ".join([f"{_quote_identifier(k)} = ?" for k in updates.keys()])
                 values = list(updates.values())
-                values.append(asset_tag)
+                values.append(row_id)
                 
+                self._adjust_summary(conn, table_name, "?", (row_id,), sign=-1)
                 cursor.execute(
-                    f"UPDATE {table_name} SET {set_clause} WHERE asset_tag = ?",
+                    f"UPDATE {_quote_identifier(table_name)} SET {set_clause} WHERE rowid = ?",
                     values
                 )
                 if cursor.rowcount > 0:
+                    cursor.execute(
+                        f"INSERT INTO {CHANGE_LOG_TABLE} (table_name, row_id) VALUES (?, ?)",
+                        (table_name, row_id)
+                    )
+                    self._refresh_search_rows(conn, table_name, "?", (row_id,))
+                    self._adjust_summary(conn, table_name, "?", (row_id,))
+                    self._bump_versions(conn, "SELECT ? AS asset_tag", (asset_tag,))
                     conn.commit()
                     updated = True
                     break
-            
-            return updated
\ No newline at end of file
+
+        if updated:
+            self._evict_assets([asset_tag])
+        return updated
+
+    def _resolve_tags(self, conn: sqlite3.Connection, asset_tags: List[str]) -> List[tuple]:
+        """(asset_tag, table_name, row_id) for every known tag, in table order"""
+        locations = []
+        for chunk in _chunks(asset_tags, MAX_SQL_VARIABLES):
+            placeholders = ", ".join("?" for _ in chunk)
+            locations.extend(conn.execute(
+                f"SELECT asset_tag, table_name, row_id FROM {TAG_INDEX_TABLE} "
+                f"WHERE asset_tag IN ({placeholders})",
+                chunk
+            ).fetchall())
+        return sorted(locations, key=lambda loc: loc[1])
+
+    def get_assets_by_tags(self, asset_tags: List[str]) -> Dict[str, List[Dict]]:
+        """Bulk version of get_asset_by_tag: tag -> matching assets (empty list if unknown)"""
+        tags = list(dict.fromkeys(asset_tags))
+        results = {tag: [] for tag in tags}
+        with self.pool.connection() as conn:
+            conn.row_factory = sqlite3.Row
+            by_table: Dict[str, Dict[int, str]] = {}
+            for tag, table_name, row_id in self._resolve_tags(conn, tags):
+                by_table.setdefault(table_name, {})[row_id] = tag
+
+            # One query per table (per chunk) instead of one per tag
+            for table_name, rows in by_table.items():
+                for chunk in _chunks(list(rows), MAX_SQL_VARIABLES):
+                    placeholders = ", ".join("?" for _ in chunk)
+                    for row in conn.execute(
+                        f"SELECT rowid AS __rowid, * FROM {_quote_identifier(table_name)} "
+                        f"WHERE rowid IN ({placeholders})",
+                        chunk
+                    ):
+                        asset_data = dict(row)
+                        row_id = asset_data.pop("__rowid")
+                        asset_data['_source_table'] = table_name
+                        results[rows[row_id]].append(asset_data)
+        return results
+
+    def reassign_assets(self, items: List[tuple]) -> Dict[str, str]:
+        """
+        Bulk version of reassign_asset for (asset_tag, updates) pairs.
+
+        Everything is applied in one transaction with one executemany per
+        (table, updated columns) group. Updates for a repeated tag are merged,
+        later items winning. Returns tag -> "updated", "not_found" or "invalid"
+        (no fields, or a field the asset's table doesn't have).
+        """
+        merged: Dict[str, Dict] = {}
+        for asset_tag, updates in items:
+            merged.setdefault(asset_tag, {}).update(updates)
+
+        results = {}
+        with self.pool.connection() as conn:
+            first_match = {}
+            for tag, table_name, row_id in self._resolve_tags(conn, list(merged)):
+                first_match.setdefault(tag, (table_name, row_id))
+            table_columns, table_types = {}, {}
+            for table_name, columns, column_types in conn.execute(
+                f"SELECT table_name, columns, column_types FROM {CATALOG_TABLE}"
+            ):
+                table_columns[table_name] = set(json.loads(columns))
+                table_types[table_name] = json.loads(column_types or "{}")
+
+            groups: Dict[tuple, List] = {}
+            changes = []
+            for tag, updates in merged.items():
+                if tag not in first_match:
+                    results[tag] = "not_found"
+                    continue
+                table_name, row_id = first_match[tag]
+                if not updates or not set(updates) <= table_columns.get(table_name, set()):
+                    results[tag] = "invalid"
+                    continue
+                updates = self._normalize_updates(table_types[table_name], updates)
+                keys = tuple(sorted(updates))
+                groups.setdefault((table_name, keys), []).append([updates[k] for k in keys] + [row_id])
+                changes.append((table_name, row_id))
+                results[tag] = "updated"
+
+            changed_chunks = [
+                (table_name, ", ".join("?" for _ in chunk), tuple(chunk))
+                for table_name in {table_name for table_name, _ in changes}
+                for chunk in _chunks([row_id for t, row_id in changes if t == table_name], MAX_SQL_VARIABLES)
+            ]
+            for table_name, placeholders, chunk in changed_chunks:
+                self._adjust_summary(conn, table_name, placeholders, chunk, sign=-1)
+            for (table_name, keys), params in groups.items():
+                set_clause = ", ".join(f"{_quote_identifier(k)} = ?" for k in keys)
+                conn.executemany(
+                    f"UPDATE {_quote_identifier(table_name)} SET {set_clause} WHERE rowid = ?",
+                    params
+                )
+            for table_name, placeholders, chunk in changed_chunks:
+                self._refresh_search_rows(conn, table_name, placeholders, chunk)
+                self._adjust_summary(conn, table_name, placeholders, chunk)
+            conn.executemany(
+                f"INSERT INTO {CHANGE_LOG_TABLE} (table_name, row_id) VALUES (?, ?)",
+                changes
+            )
+            updated_tags = [tag for tag, result in results.items() if result == "updated"]
+            for chunk in _chunks(updated_tags, MAX_SQL_VARIABLES):
+                self._bump_versions(
+                    conn,
+                    " UNION ALL ".join("SELECT ? AS asset_tag" for _ in chunk),
+                    tuple(chunk)
+                )
+        self._evict_assets(updated_tags)
+        return results
+
+    def _filter_clauses(self, conn: sqlite3.Connection, table: str, entry: Dict, filters: Dict[str, str]) -> tuple:
+        """WHERE terms and parameters for list/export filters (see list_assets)"""
+        columns = entry["columns"]
+        column_types = entry["column_types"] or {}
+        where, params = [], []
+        for key, value in filters.items():
+            column, operator = key, None
+            base, _, suffix = key.rpartition("__")
+            if key not in columns and suffix in RANGE_OPERATORS:
+                column, operator = base, RANGE_OPERATORS[suffix]
+            if column not in columns:
+                raise ValueError(f"Unknown filter column: {column}")
+            column_type = column_types.get(column)
+            if operator is not None:
+                where.append(f"{_quote_identifier(column)} {operator} ?")
+                params.append(_range_value(column, column_type, value))
+            else:
+                values = [normalize_date(value)] if column_type == "date" else _filter_values(value)
+                where.append(f"{_quote_identifier(column)} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            self._note_filter_use(conn, table, column)
+        return where, params
+
+    def list_assets(
+        self,
+        table: Optional[str] = None,
+        filters: Optional[Dict[str, str]] = None,
+        sort: str = "asset_tag",
+        descending: bool = False,
+        limit: int = LIST_DEFAULT_LIMIT,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """
+        One page of assets from an imported table using keyset pagination.
+
+        Rows are ordered by (sort column, rowid); the returned next_cursor
+        encodes the last row's position so every page is an index range scan
+        regardless of depth. Filters are equality matches on catalogued
+        columns, or range matches with a __gte/__gt/__lte/__lt suffix (dates
+        in any accepted layout, numbers for numeric columns). Raises
+        ValueError for unknown tables/columns, bad range values or bad cursors.
+        """
+        filters = filters or {}
+        limit = max(1, min(limit, LIST_MAX_LIMIT))
+        with self.pool.connection() as conn:
+            if table is None:
+                tables = self._catalog_tables(conn, with_asset_tag=True) or self._catalog_tables(conn)
+                if not tables:
+                    return {"table": None, "items": [], "next_cursor": None, "limit": limit}
+                table = tables[0]
+            entry = self._catalog_entry(conn, table)
+            if entry is None:
+                raise ValueError(f"Unknown table: {table}")
+            columns = entry["columns"]
+            if sort not in columns:
+                raise ValueError(f"Unknown sort column: {sort}")
+
+            where, params = self._filter_clauses(conn, table, entry, filters)
+
+            sort_col = _quote_identifier(sort)
+            if cursor is not None:
+                last_value, last_rowid = _decode_cursor(cursor)
+                # NULLs sort first ascending / last descending in SQLite
+                if not descending and last_value is None:
+                    where.append(f"(({sort_col} IS NULL AND rowid > ?) OR {sort_col} IS NOT NULL)")
+                    params.append(last_rowid)
+                elif not descending:
+                    where.append(f"({sort_col} > ? OR ({sort_col} = ? AND rowid > ?))")
+                    params.extend([last_value, last_value, last_rowid])
+                elif last_value is None:
+                    where.append(f"({sort_col} IS NULL AND rowid < ?)")
+                    params.append(last_rowid)
+                else:
+                    where.append(f"({sort_col} < ? OR ({sort_col} = ? AND rowid < ?) OR {sort_col} IS NULL)")
+                    params.extend([last_value, last_value, last_rowid])
+
+            direction = "DESC" if descending else "ASC"
+            query = f"SELECT rowid AS __rowid, * FROM {_quote_identifier(table)}"
+            if where:
+                query += " WHERE " + " AND ".join(where)
+            query += f" ORDER BY {sort_col} {direction}, rowid {direction} LIMIT ?"
+            params.append(limit + 1)
+
+            conn.row_factory = sqlite3.Row
+            rows = [dict(row) for row in conn.execute(query, params)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][sort], rows[-1]["__rowid"])
+        for row in rows:
+            del row["__rowid"]
+            row["_source_table"] = table
+        return {"table": table, "items": rows, "next_cursor": next_cursor, "limit": limit}
+
+    def prepare_export(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Dict[str, str]] = None,
+        check_types: bool = False
+    ) -> Dict:
+        """
+        Validate an export of one table (optionally a subset of columns, with
+        list_assets-style filters) and build its query for iter_export.
+
+        Raises ValueError for unknown tables, columns or bad filter values, so
+        errors surface before any rows are streamed. With ``check_types`` the
+        returned column types are narrowed to the values actually stored (for
+        formats with a fixed schema, like Parquet).
+        """
+        with self.pool.connection() as conn:
+            entry = self._catalog_entry(conn, table)
+            if entry is None:
+                raise ValueError(f"Unknown table: {table}")
+            columns = columns or entry["columns"]
+            unknown = [c for c in columns if c not in entry["columns"]]
+            if unknown:
+                raise ValueError(f"Unknown export column(s): {', '.join(unknown)}")
+            where, params = self._filter_clauses(conn, table, entry, filters or {})
+            column_types = {c: (entry["column_types"] or {}).get(c) for c in columns}
+            if check_types:
+                column_types = self._stored_types(conn, table, column_types)
+
+        query = f"SELECT {', '.join(_quote_identifier(c) for c in columns)} FROM {_quote_identifier(table)}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY rowid"
+        return {
+            "table": table,
+            "columns": columns,
+            "column_types": column_types,
+            "query": query,
+            "params": params,
+        }
+
+    def _stored_types(
+        self, conn: sqlite3.Connection, table: str, column_types: Dict[str, Optional[str]]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Widen integer/real column types to fit every stored value.
+
+        Types are inferred on import, but a reassignment can later store text
+        (user_id="E1001") in a column inferred as integer. One scan of the table.
+        """
+        numeric = [c for c, t in column_types.items() if t in ("integer", "real")]
+        if not numeric:
+            return column_types
+        checks = ", ".join(
+            f"MAX(typeof({_quote_identifier(c)}) IN ('text', 'blob')), MAX(typeof({_quote_identifier(c)}) = 'real')"
+            for c in numeric
+        )
+        found = conn.execute(f"SELECT {checks} FROM {_quote_identifier(table)}").fetchone()
+        column_types = dict(column_types)
+        for i, column in enumerate(numeric):
+            has_text, has_real = found[2 * i], found[2 * i + 1]
+            if has_text:
+                column_types[column] = "text"
+            elif has_real:
+                column_types[column] = "real"
+        return column_types
+
+    def iter_export(self, export: Dict, chunk_size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+        """
+        Yield the rows of a prepared export in chunks of ``chunk_size``.
+
+        Uses its own read-only connection rather than the per-thread pool,
+        since a streaming response may resume the generator on any thread; its
+        single read transaction keeps the export consistent however slowly the
+        client reads.
+        """
+        conn = sqlite3.connect(
+            f"{Path(self.db_path).as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        try:
+            cursor = conn.execute(export["query"], export["params"])
+            while rows := cursor.fetchmany(chunk_size):
+                yield rows
+        finally:
+            conn.close()
+
+    def get_summary(self, today: Optional[datetime.date] = None) -> Dict:
+        """
+        Inventory counts by department, location and assignment state plus
+        pending returns (date_of_return today or later), across every table
+        with an asset_tag. Read from the summary table, so the cost depends on
+        the number of distinct values, not the number of assets.
+        """
+        today = (today or datetime.date.today()).isoformat()
+        with self.pool.connection() as conn:
+            counts: Dict[str, Dict] = {"department": {}, "location": {}, "assignment": {}}
+            for dimension, value, count in conn.execute(
+                f"""
+                SELECT dimension, value, SUM(count) FROM {SUMMARY_TABLE}
+                WHERE dimension IN ('department', 'location', 'assignment')
+                GROUP BY dimension, value
+                ORDER BY dimension, SUM(count) DESC, value
+                """
+            ):
+                counts[dimension][value or None] = count
+            pending = conn.execute(
+                f"SELECT COALESCE(SUM(count), 0) FROM {SUMMARY_TABLE} "
+                f"WHERE dimension = 'date_of_return' AND value >= ? AND value GLOB {ISO_DATE_GLOB}",
+                (today,)
+            ).fetchone()[0]
+            upcoming = conn.execute(
+                f"""
+                SELECT value, SUM(count) FROM {SUMMARY_TABLE}
+                WHERE dimension = 'date_of_return' AND value >= ? AND value GLOB {ISO_DATE_GLOB}
+                GROUP BY value ORDER BY value LIMIT ?
+                """,
+                (today, SUMMARY_UPCOMING_RETURNS)
+            ).fetchall()
+            total = conn.execute(
+                f"SELECT COALESCE(SUM(row_count), 0) FROM {CATALOG_TABLE} WHERE has_asset_tag = 1"
+            ).fetchone()[0]
+        return {
+            "total": total,
+            "by_department": [{"department": k, "count": v} for k, v in counts["department"].items()],
+            "by_location": [{"location": k, "count": v} for k, v in counts["location"].items()],
+            "assignment": {
+                "assigned": counts["assignment"].get("assigned", 0),
+                "unassigned": counts["assignment"].get("unassigned", 0),
+            },
+            "pending_returns": {
+                "as_of": today,
+                "count": pending,
+                "upcoming": [{"date": date, "count": count} for date, count in upcoming],
+            },
+        }
+
+    def get_schema(self) -> List[Dict]:
+        """Inferred column types and non-conformance issues for every imported table"""
+        with self.pool.connection() as conn:
+            return [
+                {
+                    "table": table_name,
+                    "sheet": sheet_name,
+                    "rows": row_count,
+                    "columns": json.loads(column_types) if column_types else {c: None for c in json.loads(columns)},
+                    "issues": json.loads(issues or "[]"),
+                }
+                for table_name, sheet_name, row_count, columns, column_types, issues in conn.execute(
+                    f"SELECT table_name, sheet_name, row_count, columns, column_types, issues "
+                    f"FROM {CATALOG_TABLE} ORDER BY rowid"
+                )
+            ]
+
+    def _match_expression(self, query: str) -> str:
+        """FTS5 MATCH expression: every term must appear (substring for trigram, prefix otherwise)"""
+        terms = query.split()
+        if self.search_tokenizer == "trigram":
+            # Trigram can only match terms of 3+ characters
+            terms = [t for t in terms if len(t) >= 3]
+            if not terms:
+                raise ValueError("Search terms must be at least 3 characters")
+            return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        if not terms:
+            raise ValueError("Empty search query")
+        return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+    def search_assets(self, query: str, limit: int = 20, table: Optional[str] = None) -> List[Dict]:
+        """
+        Ranked full-text search over the text columns of imported tables.
+
+        Uses the per-table FTS5 indexes built on import (trigram, so partial
+        serials/names match anywhere in a value). Results carry _source_table
+        and _rank (bm25, lower is better).
+        """
+        if self.search_tokenizer is None:
+            raise RuntimeError("Asset search requires SQLite FTS5")
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        match = self._match_expression(query)
+        with self.pool.connection() as conn:
+            tables = [table] if table else self._catalog_tables(conn)
+            hits = []
+            for table_name in tables:
+                if not self._search_columns(conn, table_name):
+                    continue
+                hits.extend(
+                    (rank, table_name, row_id)
+                    for row_id, rank in conn.execute(
+                        f"SELECT rowid, bm25({_search_table(table_name)}) AS rank "
+                        f"FROM {_search_table(table_name)} WHERE {_search_table(table_name)} MATCH ? "
+                        f"ORDER BY rank LIMIT ?",
+                        (match, limit)
+                    )
+                )
+            hits.sort()
+            hits = hits[:limit]
+
+            conn.row_factory = sqlite3.Row
+            results = []
+            for rank, table_name, row_id in hits:
+                row = conn.execute(
+                    f"SELECT * FROM {_quote_identifier(table_name)} WHERE rowid = ?", (row_id,)
+                ).fetchone()
+                if row:
+                    asset_data = dict(row)
+                    asset_data['_source_table'] = table_name
+                    asset_data['_rank'] = rank
+                    results.append(asset_data)
+        return results
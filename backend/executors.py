@@ -0,0 +1,82 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from fastapi import HTTPException, status
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """
+    Thread (or process) pool for blocking work called from async routes.
+
+    At most ``max_workers`` jobs run at once and at most ``max_pending`` may be
+    queued or running; beyond that new work is rejected with 503 instead of
+    piling up behind the event loop. With ``processes=True`` jobs run in
+    worker processes, for CPU-bound work that would otherwise hold the GIL;
+    the callable and its arguments must then be picklable.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int, processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.processes = processes
+        if processes:
+            # spawn (the Windows default everywhere): forking a process that
+            # already runs threads can leave locks held in the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._completed = 0
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                logger.warning(f"{self.name} pool saturated ({self._pending} pending)")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool without blocking the event loop"""
+        self._reserve()
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Release on completion, not on await, so cancelled requests still count until done
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
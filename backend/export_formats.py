@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    # Optional: Parquet export
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# format -> response media type
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _csv_rows(columns: List[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_rows(columns: List[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    # Keys are encoded once; only values are encoded per row
+    keys = [json.dumps(c) + ": " for c in columns]
+    encode = json.JSONEncoder(default=str).encode
+    for rows in chunks:
+        yield "".join(
+            "{" + ", ".join(k + encode(v) for k, v in zip(keys, row)) + "}\n" for row in rows
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_schema(columns: List[str], column_types: Dict[str, Optional[str]]):
+    arrow_types = {"integer": pyarrow.int64(), "real": pyarrow.float64()}
+    return pyarrow.schema(
+        [(c, arrow_types.get(column_types.get(c), pyarrow.string())) for c in columns]
+    )
+
+
+def _parquet_rows(
+    columns: List[str], column_types: Dict[str, Optional[str]], chunks: Iterable[List[tuple]]
+) -> Iterator[bytes]:
+    """One row group per chunk, streamed out as each is written"""
+    schema = _parquet_schema(columns, column_types)
+    text_columns = [i for i, field in enumerate(schema) if field.type == pyarrow.string()]
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            values = [list(column) for column in zip(*rows)]
+            for i in text_columns:
+                values[i] = [v if v is None or isinstance(v, str) else str(v) for v in values[i]]
+            writer.write_table(pyarrow.Table.from_arrays(values, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def check_format(fmt: str):
+    """Raise ValueError for formats this server can't produce"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("Parquet export requires pyarrow to be installed")
+
+
+def encode_export(
+    fmt: str,
+    columns: List[str],
+    column_types: Dict[str, Optional[str]],
+    chunks: Iterable[List[tuple]]
+) -> Iterator[bytes]:
+    """Encode row chunks (from ExcelSQLiteSync.iter_export) as a stream of bytes"""
+    check_format(fmt)
+    if fmt == "csv":
+        return _csv_rows(columns, chunks)
+    if fmt == "ndjson":
+        return _ndjson_rows(columns, chunks)
+    return _parquet_rows(columns, column_types, chunks)
@@ -0,0 +1,118 @@
+import os
+import threading
+from typing import Callable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    # Optional: inotify/FSEvents/ReadDirectoryChanges notifications
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _WakeHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "WorkbookWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = {getattr(event, "src_path", None), getattr(event, "dest_path", None)}
+        if self.watcher.path in {os.path.abspath(p) for p in paths if p}:
+            self.watcher.wake()
+
+
+class WorkbookWatcher:
+    """
+    Calls ``on_change`` after the watched file changes and has settled.
+
+    Change detection uses filesystem notifications when watchdog is installed
+    and falls back to polling mtime/size every ``poll_seconds``. A change is
+    only acted on once the file's mtime and size have stayed the same for
+    ``settle_seconds``, so a workbook that is still being saved is not read.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[], object],
+        poll_seconds: float = 2.0,
+        settle_seconds: float = 2.0,
+    ):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._last: Optional[Tuple[int, int]] = None
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wake(self):
+        self._wake.set()
+
+    def _settled_signature(self, signature: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Wait until the file stops changing; None if stopped or the file vanished"""
+        while not self._stop.wait(self.settle_seconds):
+            current = self._signature()
+            if current == signature:
+                return current
+            if current is None:
+                return None
+            signature = current
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            signature = self._signature()
+            if signature is None or signature == self._last:
+                continue
+            signature = self._settled_signature(signature)
+            if signature is None:
+                continue
+            logger.info(f"Detected change to {self.path}; importing")
+            try:
+                self.on_change()
+            except Exception as e:
+                # Retried on the next change rather than on every poll
+                logger.error(f"Auto-import of {self.path} failed: {getattr(e, 'detail', e)}")
+            self._last = signature
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._last = self._signature()
+        if Observer is not None and os.path.isdir(os.path.dirname(self.path)):
+            self._observer = Observer()
+            self._observer.schedule(_WakeHandler(self), os.path.dirname(self.path), recursive=False)
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name="workbook-watcher", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching {self.path} ({'notifications' if self._observer is not None else 'polling'})"
+        )
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable
+
+
+class LoginThrottle:
+    """
+    Failed-login throttling per key (a username or a client IP).
+
+    Once a key has ``max_failures`` failures within ``window_seconds`` it is
+    locked out for ``lockout_seconds``, doubling with every further failure
+    up to ``max_lockout_seconds``. A successful login resets the key. Only the
+    ``maxsize`` most recently failing keys are tracked.
+    """
+
+    def __init__(
+        self,
+        max_failures: int = 5,
+        window_seconds: float = 900.0,
+        lockout_seconds: float = 30.0,
+        max_lockout_seconds: float = 900.0,
+        maxsize: int = 100000,
+    ):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+        self.maxsize = maxsize
+        # key -> [failures, first failure time, locked until]
+        self._state: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def retry_after(self, key: Hashable) -> float:
+        """Seconds until the key may try again (0 when not locked out)"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or state[2] <= now:
+                return 0.0
+            self.throttled += 1
+            return state[2] - now
+
+    def record_failure(self, key: Hashable):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[1] > self.window_seconds:
+                state = [0, now, 0.0]
+            state[0] += 1
+            excess = state[0] - self.max_failures
+            if excess >= 0:
+                lockout = min(self.lockout_seconds * 2 ** min(excess, 32), self.max_lockout_seconds)
+                state[2] = now + lockout
+            self._state[key] = state
+            self._state.move_to_end(key)
+            while len(self._state) > self.maxsize:
+                self._state.popitem(last=False)
+
+    def reset(self, key: Hashable):
+        with self._lock:
+            self._state.pop(key, None)
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "tracked": len(self._state),
+                "locked": sum(1 for state in self._state.values() if state[2] > now),
+                "throttled": self.throttled,
+            }
@@ -1,23 +1,100 @@
 # main.py (updated)
-from fastapi import FastAPI, Depends, HTTPException, status, Response
+from fastapi import FastAPI, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from email.utils import format_datetime, parsedate_to_datetime
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List
 import sqlite3
 from jose import JWTError, jwt
-from users_db import UserDB  # New import
+from users_db import UserDB, PASSWORD_HASH_SECONDS, hash_password, verify_password
 from excel_processor import ExcelSQLiteSync
 from pathlib import Path
+from contextlib import asynccontextmanager
+from executors import BoundedExecutor
+from sync_worker import SyncScheduler
+from file_watcher import WorkbookWatcher
+from cache import TTLCache
+from db_pool import pool_stats
+from metrics import REGISTRY, callback_metric, counter, histogram
+from login_throttle import LoginThrottle
+from profiling import SamplingProfiler
+from process_lock import LeaderElection
+from export_formats import EXPORT_FORMATS, check_format, encode_export
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
 
 # Configuration
 SECRET_KEY = "your-secret-key-here"  # In production, use environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-EXCEL_FILE_PATH = "C:\\Users\\Anbuselvan\\Desktop\\Book1.xlsx"
-DB_PATH = "assets.db"
+REFRESH_TOKEN_EXPIRE_DAYS = 7  # Sessions renew access tokens via /token/refresh, without bcrypt
+USER_CACHE_TTL_SECONDS = 30   # Max delay before a disable/role change made elsewhere applies
+TOKEN_CACHE_TTL_SECONDS = 60
+ASSET_CACHE_TTL_SECONDS = 10  # Cached asset lookups are also checked against the stored version
+EXCEL_FILE_PATH = os.environ.get("ASSET_EXCEL_PATH", "C:\\Users\\Anbuselvan\\Desktop\\Book1.xlsx")
+DB_PATH = os.environ.get("ASSET_DB_PATH", "assets.db")
+
+# Concurrency: blocking SQLite work runs on a bounded thread pool and bcrypt on
+# a bounded process pool (so it never holds the GIL the event loop needs);
+# requests beyond MAX_PENDING get 503 + Retry-After
+DB_POOL_WORKERS = 16
+DB_POOL_MAX_PENDING = 256
+CPU_POOL_WORKERS = min(4, os.cpu_count() or 1)
+CPU_POOL_MAX_PENDING = 32
+
+# Failed logins: lock a username after 5 failures and a client IP after 20
+# (within 15 minutes), starting at 30s and doubling per further failure
+LOGIN_MAX_FAILURES_PER_USER = 5
+LOGIN_MAX_FAILURES_PER_IP = 20
+LOGIN_FAILURE_WINDOW_SECONDS = 900
+LOGIN_LOCKOUT_SECONDS = 30
+LOGIN_MAX_LOCKOUT_SECONDS = 900
+
+# Background Excel export: writes are debounced into one export; set an
+# interval to also export periodically
+SYNC_AFTER_WRITES = True
+SYNC_DEBOUNCE_SECONDS = 5.0
+SYNC_MAX_DELAY_SECONDS = 60.0
+SYNC_INTERVAL_SECONDS = None
+
+# Re-import the workbook (incrementally) when it changes on disk
+WATCH_EXCEL_FILE = True
+WATCH_POLL_SECONDS = 2.0
+WATCH_SETTLE_SECONDS = 2.0
+
+# Multiple workers (uvicorn --workers N, or hosts sharing the database
+# directory): one elected leader does the startup import and watches the
+# workbook; the others attach to its database and take over within
+# LEADER_RETRY_SECONDS if it exits. Exports from any worker are serialized
+# on the workbook lock file next to the database.
+LEADER_LOCK_PATH = f"{DB_PATH}.leader.lock"
+LEADER_RETRY_SECONDS = 5.0
+# How often a follower that started first re-checks for the leader's import
+FOLLOWER_WAIT_SECONDS = 1.0
+# A failed warm-up (e.g. the workbook is missing or mid-save) is retried,
+# starting after WARMUP_RETRY_SECONDS and doubling up to the max
+WARMUP_RETRY_SECONDS = 2.0
+WARMUP_MAX_RETRY_SECONDS = 60.0
+
+# Largest number of tags accepted by the bulk asset endpoints
+BULK_MAX_ITEMS = 10000
+
+# Observability: /metrics is unauthenticated for Prometheus scrapers; the
+# sampling profiler (GET /debug/profile, admin only) stays off unless
+# ASSET_PROFILING_ENABLED=1 is set
+PROFILING_ENABLED = os.environ.get("ASSET_PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_MAX_SECONDS = 60
+SLOW_REQUEST_SECONDS = 1.0  # Requests slower than this are logged
 
 # CORS Configuration
 ORIGINS = [
@@ -28,10 +105,80 @@ ORIGINS = [
 ]
 
 # Initialize databases
-user_db = UserDB()  # Replaces fake_users_db
+# Nothing slow runs at import time: seeding the admin (bcrypt) and the
+# startup import happen in the lifespan warm-up, reported by GET /ready
+user_db = UserDB(cache_ttl=USER_CACHE_TTL_SECONDS, seed_admin=False)  # Replaces fake_users_db
+token_cache = TTLCache(maxsize=4096, ttl=TOKEN_CACHE_TTL_SECONDS)  # token -> verified payload
+leader_election = LeaderElection(LEADER_LOCK_PATH, retry_seconds=LEADER_RETRY_SECONDS)
 excel_sync = ExcelSQLiteSync(
     excel_path=EXCEL_FILE_PATH,
-    db_path=DB_PATH
+    db_path=DB_PATH,
+    asset_cache_ttl=ASSET_CACHE_TTL_SECONDS,
+    defer_init=True
+)
+
+db_executor = BoundedExecutor("db", DB_POOL_WORKERS, DB_POOL_MAX_PENDING)
+cpu_executor = BoundedExecutor("cpu", CPU_POOL_WORKERS, CPU_POOL_MAX_PENDING, processes=True)
+user_throttle = LoginThrottle(
+    LOGIN_MAX_FAILURES_PER_USER, LOGIN_FAILURE_WINDOW_SECONDS, LOGIN_LOCKOUT_SECONDS, LOGIN_MAX_LOCKOUT_SECONDS
+)
+ip_throttle = LoginThrottle(
+    LOGIN_MAX_FAILURES_PER_IP, LOGIN_FAILURE_WINDOW_SECONDS, LOGIN_LOCKOUT_SECONDS, LOGIN_MAX_LOCKOUT_SECONDS
+)
+sync_scheduler = SyncScheduler(
+    excel_sync.sqlite_to_excel,
+    debounce_seconds=SYNC_DEBOUNCE_SECONDS,
+    max_delay_seconds=SYNC_MAX_DELAY_SECONDS,
+    interval_seconds=SYNC_INTERVAL_SECONDS
+)
+workbook_watcher = WorkbookWatcher(
+    EXCEL_FILE_PATH,
+    excel_sync.excel_to_sqlite,
+    poll_seconds=WATCH_POLL_SECONDS,
+    settle_seconds=WATCH_SETTLE_SECONDS
+)
+
+profiler = SamplingProfiler()
+
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+_caches = {"user": user_db.user_cache, "token": token_cache, "asset": excel_sync.asset_cache}
+_executors = {"db": db_executor, "cpu": cpu_executor}
+callback_metric(
+    "cache_hits_total", "In-process cache hits", ("cache",),
+    lambda: {(name,): cache.stats()["hits"] for name, cache in _caches.items()}, kind="counter"
+)
+callback_metric(
+    "cache_misses_total", "In-process cache misses", ("cache",),
+    lambda: {(name,): cache.stats()["misses"] for name, cache in _caches.items()}, kind="counter"
+)
+callback_metric(
+    "cache_entries", "Entries held per in-process cache", ("cache",),
+    lambda: {(name,): cache.stats()["size"] for name, cache in _caches.items()}
+)
+LOGINS = counter("login_attempts_total", "Password logins by outcome", ("outcome",))
+TOKEN_REFRESHES = counter("token_refreshes_total", "Refresh token exchanges by outcome", ("outcome",))
+callback_metric(
+    "login_locked_keys", "Usernames/IPs currently locked out after failed logins", ("kind",),
+    lambda: {("user",): user_throttle.stats()["locked"], ("ip",): ip_throttle.stats()["locked"]}
+)
+callback_metric(
+    "executor_pending", "Jobs queued or running per executor", ("executor",),
+    lambda: {(name,): ex.stats()["pending"] for name, ex in _executors.items()}
+)
+callback_metric(
+    "executor_rejected_total", "Jobs rejected with 503 per executor", ("executor",),
+    lambda: {(name,): ex.stats()["rejected"] for name, ex in _executors.items()}, kind="counter"
+)
+callback_metric(
+    "sqlite_pool_connections_in_use", "Checked-out pooled connections", ("db",),
+    lambda: {(os.path.basename(path),): stats["in_use"] for path, stats in pool_stats().items()}
+)
+callback_metric(
+    "sqlite_pool_wait_seconds_total", "Time spent waiting for a pooled connection", ("db",),
+    lambda: {(os.path.basename(path),): stats["wait_time_total"] for path, stats in pool_stats().items()},
+    kind="counter"
 )
 
 # Models
@@ -39,6 +186,10 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     role: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class User(BaseModel):
     username: str
@@ -58,6 +209,7 @@ class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     email: Optional[str] = None
     disabled: Optional[bool] = None
+    role: Optional[str] = None
 
 class AssetReassignment(BaseModel):
     user_id: Optional[str] = None
@@ -67,18 +219,122 @@ class AssetReassignment(BaseModel):
     date_of_return: Optional[str] = None
     date_of_reassign: Optional[str] = None
 
+class BulkAssetLookup(BaseModel):
+    asset_tags: List[str]
+
+class BulkReassignmentItem(AssetReassignment):
+    asset_tag: str
+
+class BulkAssetReassignment(BaseModel):
+    items: List[BulkReassignmentItem]
+
 # Security setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-app = FastAPI()
+# Warm-up progress for GET /ready; other routes answer 503 until it is done
+warmup = {
+    "status": "starting", "phase": None, "started_at": None, "ready_at": None, "error": None, "retry_at": None
+}
+WARMUP_EXEMPT_PATHS = {"/ready", "/metrics"}
+warmup_stop = threading.Event()  # Set on shutdown to end a follower's wait or a retry delay
+
+def _warm_up():
+    warmup["started_at"] = datetime.utcnow().isoformat()
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        try:
+            warmup["phase"] = "users"
+            user_db.ensure_admin()
+            warmup["phase"] = "assets"
+            # Only the leader imports; an unchanged workbook is skipped without hashing it.
+            # A follower waits for the leader's import (or takes over if it is gone).
+            while not excel_sync.initialize(import_workbook=leader_election.try_acquire()):
+                warmup["phase"] = "waiting for import"
+                if warmup_stop.wait(FOLLOWER_WAIT_SECONDS):
+                    return
+            leader_election.start(_on_elected)
+            break
+        except Exception as e:
+            retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            warmup.update(status="failed", error=getattr(e, "detail", None) or str(e), retry_at=retry_at.isoformat())
+            logger.error(f"Startup failed during {warmup['phase']}: {warmup['error']}; retrying in {delay:g}s")
+            if warmup_stop.wait(delay):
+                warmup["retry_at"] = None
+                return
+            warmup.update(status="starting", retry_at=None)
+            delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+    warmup.update(status="ready", phase=None, error=None, ready_at=datetime.utcnow().isoformat())
+    logger.info("Startup complete")
+
+def _warmup_retry_after() -> Optional[str]:
+    """Retry-After for a request refused during warm-up: None unless an attempt is running or scheduled"""
+    if warmup["status"] == "starting":
+        return "1"
+    if warmup["retry_at"] is None:
+        return None
+    remaining = (datetime.fromisoformat(warmup["retry_at"]) - datetime.utcnow()).total_seconds()
+    return str(max(1, math.ceil(remaining)))
+
+def _on_elected(initial: bool):
+    if not initial:
+        # Catch up on workbook edits made while no process was watching
+        excel_sync.excel_to_sqlite()
+    if WATCH_EXCEL_FILE:
+        workbook_watcher.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sync_scheduler.start()
+    # Serve /ready (and 503s) right away instead of blocking startup on the import
+    warm_up = asyncio.create_task(asyncio.to_thread(_warm_up))
+    yield
+    warmup_stop.set()
+    await warm_up
+    workbook_watcher.stop()
+    sync_scheduler.stop()
+    leader_election.stop()
+    db_executor.shutdown(wait=False)
+    cpu_executor.shutdown(wait=True)
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def require_warm(request: Request, call_next):
+    if warmup["status"] != "ready" and request.url.path not in WARMUP_EXEMPT_PATHS:
+        retry_after = _warmup_retry_after()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Service is starting up" if warmup["status"] == "starting" else "Startup failed"},
+            headers={"Retry-After": retry_after} if retry_after else None
+        )
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        # Label by route template, not raw path, to keep series bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=status_code)
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            logger.warning(f"Slow request: {request.method} {route} took {elapsed:.3f}s ({status_code})")
 
 # Add CORS middleware
+# Added last so it is the outermost layer: preflights are answered before the
+# warm-up gate, and its 503s carry the CORS headers the browser needs to read them
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Content-Disposition"],
 )
 
 # Authentication Utilities
@@ -88,6 +344,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def _issue_tokens(user: dict) -> tuple:
+    """Access token response plus the new refresh token's (jti, expiry timestamp)"""
+    jti = uuid.uuid4().hex
+    expires = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    refresh_token = jwt.encode(
+        {"sub": user["username"], "type": "refresh", "jti": jti, "exp": expires},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+    response = {
+        "access_token": create_access_token(
+            data={"sub": user["username"], "role": user["role"]},
+            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "token_type": "bearer",
+        "role": user["role"],
+        "refresh_token": refresh_token
+    }
+    return response, jti, time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+def _decode_refresh_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        payload = {}
+    if payload.get("type") != "refresh" or not payload.get("sub") or not payload.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,10 +384,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if (payload := token_cache.get(token)) is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            # Never cache a payload past its own expiry
+            token_cache.set(token, payload, ttl=min(TOKEN_CACHE_TTL_SECONDS, payload.get("exp", 0) - time.time()))
         username: str = payload.get("sub")
         role: str = payload.get("role")
-        if username is None or role is None:
+        if username is None or role is None or payload.get("type", "access") != "access":
             raise credentials_exception
         
         # Verify the role is valid
@@ -108,7 +400,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    if not (user := user_db.get_user(username)):
+    user = user_db.get_cached_user(username) or await db_executor.run(user_db.get_user, username)
+    if not user:
         raise credentials_exception
         
     # Ensure the user's role matches the token's role
@@ -133,9 +426,12 @@ async def require_admin(current_user: dict = Depends(get_current_active_user)):
 # Routes
 @app.post("/register", status_code=status.HTTP_201_CREATED)
 async def register_user(user: UserCreate, current_user: dict = Depends(require_admin)):
-    if not user_db.create_user(
+    with PASSWORD_HASH_SECONDS.time(operation="hash"):
+        hashed_password = await cpu_executor.run(hash_password, user.password)
+    if not await db_executor.run(
+        user_db.create_user,
         username=user.username,
-        password=user.password,
+        hashed_password=hashed_password,
         full_name=user.full_name,
         email=user.email,
         role=user.role
@@ -147,22 +443,89 @@ async def register_user(user: UserCreate, current_user: dict = Depends(require_a
     return {"message": "User created successfully"}
 
 
+@app.put("/users/{username}")
+async def update_user(username: str, update: UserUpdate, current_user: dict = Depends(require_admin)):
+    """Update a user's profile, role or disabled flag (Admin only)"""
+    if update.role is not None and update.role not in ["admin", "user"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid role"
+        )
+    if not await db_executor.run(user_db.update_user, username, **update.dict()):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found or nothing to update"
+        )
+    return {"message": "User updated successfully"}
+
+
 @app.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    if not (user := user_db.authenticate_user(form_data.username, form_data.password)):
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    username = form_data.username
+    client_ip = request.client.host if request.client else "unknown"
+    # Checked before any bcrypt work, so password guessing can't burn CPU
+    if retry_after := max(user_throttle.retry_after(username), ip_throttle.retry_after(client_ip)):
+        LOGINS.inc(outcome="throttled")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+
+    user = await db_executor.run(user_db.get_user, username, use_cache=False)
+    verified = False
+    if user:
+        with PASSWORD_HASH_SECONDS.time(operation="verify"):
+            verified = await cpu_executor.run(verify_password, form_data.password, user["hashed_password"])
+    if not verified:
+        LOGINS.inc(outcome="failure")
+        user_throttle.record_failure(username)
+        ip_throttle.record_failure(client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return {
-        "access_token": create_access_token(
-            data={"sub": user["username"], "role": user["role"]}, 
-            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        ),
-        "token_type": "bearer",
-        "role": user["role"]
-    }
+
+    LOGINS.inc(outcome="success")
+    user_throttle.reset(username)
+    response, jti, expires_at = _issue_tokens(user)
+    await db_executor.run(user_db.record_login, username, jti, expires_at)
+    return response
+
+@app.post("/token/refresh", response_model=Token)
+async def refresh_access_token(body: RefreshRequest):
+    """Exchange a refresh token for a new access token (and a new refresh token)"""
+    payload = _decode_refresh_token(body.refresh_token)
+    user = await db_executor.run(user_db.get_user, payload["sub"], use_cache=False)
+    if not user or user.get("disabled"):
+        TOKEN_REFRESHES.inc(outcome="invalid")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    response, jti, expires_at = _issue_tokens(user)
+    outcome = await db_executor.run(
+        user_db.rotate_refresh_token, payload["jti"], user["username"], jti, expires_at
+    )
+    TOKEN_REFRESHES.inc(outcome=outcome)
+    if outcome != "rotated":
+        if outcome == "reused":
+            logger.warning(f"Reused refresh token for {user['username']}; revoked all sessions")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return response
+
+@app.post("/token/revoke")
+async def revoke_refresh_token(body: RefreshRequest):
+    """Log out: revoke a refresh token"""
+    payload = _decode_refresh_token(body.refresh_token)
+    await db_executor.run(user_db.revoke_refresh_token, payload["jti"], payload["sub"])
+    return {"message": "Refresh token revoked"}
 
 @app.get("/users/me")
 async def read_users_me(current_user: dict = Depends(get_current_active_user)):
@@ -174,7 +537,7 @@ async def read_users_me(current_user: dict = Depends(get_current_active_user)):
 # Update the asset endpoints to properly require admin privileges
 
 async def require_asset_access(current_user: dict = Depends(get_current_active_user)):
-    print(f"Checking access for user: {current_user['username']} with role: {current_user['role']}")  # Debug logging
+    logger.debug(f"Checking access for user: {current_user['username']} with role: {current_user['role']}")
     if current_user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -183,20 +546,145 @@ async def require_asset_access(current_user: dict = Depends(get_current_active_u
         )
     return current_user
 
+# Query parameters of GET /assets that are not column filters
+LIST_CONTROL_PARAMS = {"table", "sort", "order", "limit", "cursor"}
+
+@app.get("/assets")
+async def list_assets(
+    request: Request,
+    table: Optional[str] = None,
+    sort: str = "asset_tag",
+    order: str = "asc",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(require_asset_access)
+):
+    """Browse assets with column filters (?department=IT, ?date_of_return__gte=2024-01-01), sorting and cursor paging (Admin only)"""
+    if order not in ("asc", "desc"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="order must be 'asc' or 'desc'"
+        )
+    filters = {
+        k: v for k, v in request.query_params.items()
+        if k not in LIST_CONTROL_PARAMS
+    }
+    try:
+        return await db_executor.run(
+            excel_sync.list_assets,
+            table=table,
+            filters=filters,
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@app.get("/assets/search")
+async def search_assets(
+    q: str,
+    limit: int = 20,
+    table: Optional[str] = None,
+    current_user: dict = Depends(require_asset_access)
+):
+    """Ranked full-text search by partial tag, serial, model or name (Admin only)"""
+    try:
+        items = await db_executor.run(excel_sync.search_assets, q, limit=limit, table=table)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return {"query": q, "items": items}
+
+@app.get("/assets/schema")
+async def get_asset_schema(current_user: dict = Depends(require_asset_access)):
+    """Inferred column types per imported sheet and rows that don't conform (Admin only)"""
+    try:
+        return {"tables": await db_executor.run(excel_sync.get_schema)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@app.get("/assets/summary")
+async def get_asset_summary(current_user: dict = Depends(require_asset_access)):
+    """Inventory counts by department, location, assignment and pending returns (Admin only)"""
+    try:
+        return await db_executor.run(excel_sync.get_summary)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+def _request_etags(request: Request) -> set:
+    """Entity tags listed in If-None-Match (weak prefixes dropped)"""
+    header = request.headers.get("if-none-match", "")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+def _not_modified(request: Request, entry: dict) -> bool:
+    if "if-none-match" in request.headers:
+        etags = _request_etags(request)
+        return entry["etag"] in etags or "*" in etags
+    if since := request.headers.get("if-modified-since"):
+        try:
+            return entry["last_modified"] <= parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
 @app.get("/assets/{asset_tag}")
 async def get_asset_by_tag(
     asset_tag: str,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(require_asset_access)
 ):
-    """Search assets (Admin only)"""
+    """Search assets (Admin only); supports If-None-Match / If-Modified-Since"""
     try:
-        assets = excel_sync.get_asset_by_tag(asset_tag)
-        if not assets:
+        entry = await db_executor.run(excel_sync.get_versioned_asset, asset_tag, _request_etags(request))
+        if entry is None or entry["assets"] == []:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Asset not found"
             )
-        return assets
+        headers = {
+            "ETag": entry["etag"],
+            "Last-Modified": format_datetime(entry["last_modified"], usegmt=True),
+            # Authenticated data: browsers may keep it but must revalidate
+            "Cache-Control": "private, no-cache",
+        }
+        if entry["assets"] is None or _not_modified(request, entry):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return entry["assets"]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -222,28 +710,188 @@ async def reassign_asset(
                 detail="No fields to update"
             )
             
-        if not excel_sync.reassign_asset(asset_tag, updates):
+        if not await db_executor.run(excel_sync.reassign_asset, asset_tag, updates):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Asset not found"
             )
+        if SYNC_AFTER_WRITES:
+            sync_scheduler.notify_change()
             
         return {"message": "Asset reassigned successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-@app.post("/sync/refresh")
+@app.post("/sync/refresh", status_code=status.HTTP_202_ACCEPTED)
 async def refresh_sync(current_user: dict = Depends(require_admin)):
-    """Manual sync from DB to Excel (Admin only)"""
+    """Queue a sync from DB to Excel (Admin only); poll /sync/status/{job_id}"""
+    job = sync_scheduler.request("manual")
+    return {
+        "message": "Sync queued",
+        "job_id": job["job_id"],
+        "details": job
+    }
+
+@app.get("/sync/status/{job_id}")
+async def sync_status(job_id: str, current_user: dict = Depends(require_admin)):
+    """Progress and duration of a sync job (Admin only)"""
+    if not (job := sync_scheduler.status(job_id)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found"
+        )
+    return job
+
+# Query parameters of GET /export that are not column filters
+EXPORT_CONTROL_PARAMS = {"table", "format", "columns"}
+
+@app.get("/export")
+async def export_table(
+    request: Request,
+    table: str,
+    format: str = "csv",
+    columns: Optional[str] = None,
+    current_user: dict = Depends(require_asset_access)
+):
+    """
+    Stream one table as CSV, NDJSON or Parquet (Admin only).
+
+    ?columns=a,b selects columns; other parameters filter rows as in GET /assets.
+    Rows are read from SQLite in chunks as the client consumes them.
+    """
+    filters = {
+        k: v for k, v in request.query_params.items()
+        if k not in EXPORT_CONTROL_PARAMS
+    }
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
     try:
-        result = excel_sync.sqlite_to_excel()
-        return {
-            "message": "Manual sync completed",
-            "details": result
-        }
+        check_format(format)
+        export = await db_executor.run(
+            excel_sync.prepare_export, table, columns=selected, filters=filters, check_types=format == "parquet"
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        encode_export(format, export["columns"], export["column_types"], excel_sync.iter_export(export)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
+
+def _check_bulk_size(count: int):
+    if not count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No assets given"
+        )
+    if count > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_ITEMS} assets per request"
+        )
+
+@app.post("/assets/lookup")
+async def bulk_lookup_assets(
+    lookup: BulkAssetLookup,
+    current_user: dict = Depends(require_asset_access)
+):
+    """Look up many asset tags at once (Admin only)"""
+    _check_bulk_size(len(lookup.asset_tags))
+    try:
+        results = await db_executor.run(excel_sync.get_assets_by_tags, lookup.asset_tags)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return {
+        "results": results,
+        "not_found": [tag for tag, assets in results.items() if not assets]
+    }
+
+@app.post("/assets/reassign")
+async def bulk_reassign_assets(
+    reassignment: BulkAssetReassignment,
+    current_user: dict = Depends(require_asset_access)
+):
+    """Reassign many assets in one transaction (Admin only)"""
+    _check_bulk_size(len(reassignment.items))
+    items = [
+        (item.asset_tag, {k: v for k, v in item.dict().items() if v is not None and k != "asset_tag"})
+        for item in reassignment.items
+    ]
+    try:
+        results = await db_executor.run(excel_sync.reassign_assets, items)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    if SYNC_AFTER_WRITES and any(result == "updated" for result in results.values()):
+        sync_scheduler.notify_change()
+    return {
+        "results": [{"asset_tag": tag, "status": result} for tag, result in results.items()],
+        "updated": sum(1 for result in results.values() if result == "updated")
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once warm-up (admin seed, startup import) is done, else 503"""
+    body = dict(warmup, leader=leader_election.is_leader)
+    if warmup["status"] != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics (text exposition format)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile", response_class=PlainTextResponse)
+async def capture_profile(
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    current_user: dict = Depends(require_admin)
+):
+    """Sample all threads for a while and return folded stacks for a flamegraph (Admin only)"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled"
+        )
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or interval_ms < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be in (0, {PROFILE_MAX_SECONDS}] and interval_ms at least 1"
+        )
+    try:
+        # Own thread: a capture must not hold a db/cpu worker for its duration
+        profile = await asyncio.to_thread(profiler.capture, seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    return PlainTextResponse(
+        profile["folded"],
+        headers={"X-Profile-Samples": str(profile["samples"])}
+    )
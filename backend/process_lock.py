@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How often a blocking acquire re-tries a lock held by another process
+POLL_SECONDS = 0.05
+
+
+def _try_lock_file(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock_file(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class InterProcessLock:
+    """
+    Re-entrant lock shared by every process that opens the same lock file.
+
+    Within a process it behaves like threading.RLock; across processes (uvicorn
+    workers, or hosts sharing a filesystem with working advisory locks) an
+    OS file lock is held while any thread of this process holds it. The lock
+    is released by the OS if the holder dies.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        deadline = None if timeout < 0 else time.monotonic() + timeout
+        if not (self._thread_lock.acquire(timeout=timeout) if blocking else self._thread_lock.acquire(False)):
+            return False
+        if self._depth:
+            self._depth += 1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        while not _try_lock_file(fd):
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            time.sleep(POLL_SECONDS)
+        self._fd = fd
+        self._depth = 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            fd, self._fd = self._fd, None
+            try:
+                _unlock_file(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class LeaderElection:
+    """
+    Picks one process (of those sharing ``path``) to run singleton background work.
+
+    The leader holds a lock on the file for its lifetime. Followers retry
+    every ``retry_seconds`` and take over when the leader exits or dies;
+    ``on_elected`` runs once, in whichever thread wins the election.
+    """
+
+    def __init__(self, path: str, retry_seconds: float = 5.0):
+        self.path = os.path.abspath(path)
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._fd: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def try_acquire(self) -> bool:
+        if not self.is_leader:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if not _try_lock_file(fd):
+                os.close(fd)
+                return False
+            self._fd, self.is_leader = fd, True
+            logger.info(f"Process {os.getpid()} is the leader ({self.path})")
+        return True
+
+    def start(self, on_elected: Callable[[bool], object]):
+        """
+        Call ``on_elected(initial)`` now if this process already leads (initial=True),
+        otherwise from a background thread once it takes over (initial=False).
+        """
+        if self.try_acquire():
+            on_elected(True)
+            return
+        logger.info(f"Process {os.getpid()} is a follower; retrying leadership every {self.retry_seconds}s")
+
+        def campaign():
+            while not self._stop.wait(self.retry_seconds):
+                if self.try_acquire():
+                    try:
+                        on_elected(False)
+                    except Exception as e:
+                        logger.error(f"Taking over as leader failed: {e}")
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=campaign, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.is_leader:
+            fd, self._fd, self.is_leader = self._fd, None, False
+            try:
+                _unlock_file(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for a running server.
+
+    While a capture is active a background thread samples the stacks of all
+    threads (event loop and executor workers alike) every ``interval``
+    seconds; nothing runs otherwise. Results are folded stacks
+    ("frame;frame;frame count"), the input format of flamegraph tools.
+    Only one capture runs at a time.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self.last_profile: Optional[Dict] = None
+
+    def _fold(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def capture(self, seconds: float = 10.0, interval: float = 0.005) -> Dict:
+        """Sample all threads for ``seconds``; raises RuntimeError if a capture is running"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile capture is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            while time.perf_counter() < deadline:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_thread:
+                        continue
+                    thread = thread_names.get(ident) or str(ident)
+                    stacks[f"{thread};{self._fold(frame)}"] += 1
+                samples += 1
+                time.sleep(interval)
+
+            profile = {
+                "started_at": time.time() - (time.perf_counter() - started),
+                "duration_seconds": round(time.perf_counter() - started, 3),
+                "samples": samples,
+                "interval_seconds": interval,
+                "folded": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+            }
+            self.last_profile = profile
+            logger.info(f"Captured {samples} profile samples over {profile['duration_seconds']}s")
+            return profile
+        finally:
+            self._lock.release()
@@ -0,0 +1,174 @@
+import datetime
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Inferred column types and the SQLite affinity each is stored with
+# (mixed columns keep no affinity so numbers and text both survive)
+AFFINITIES = {
+    "integer": "INTEGER",
+    "real": "REAL",
+    "date": "TEXT",
+    "category": "TEXT",
+    "text": "TEXT",
+    "mixed": "",
+    "empty": "",
+}
+
+# Text layouts accepted as dates, tried in order (day-first, as entered locally)
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+)
+
+# Cheap pre-check so ordinary text never goes through strptime
+_DATE_SHAPE = re.compile(r"^\d{1,4}[-/. ](\d{1,2}|[A-Za-z]{3})[-/. ]\d{2,4}(\b|T)")
+
+# Text columns with at most this many distinct values (and mostly repeats) are categorical
+CATEGORY_MAX_DISTINCT = 64
+# Share of values that must be dates for a column to be typed as a date
+DATE_MIN_SHARE = 0.9
+
+
+def iso_date(value: datetime.datetime) -> str:
+    """ISO 8601 text for a date/datetime; midnight datetimes become plain dates"""
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0):
+            return value.date().isoformat()
+        return value.isoformat(sep=" ", timespec="seconds")
+    return value.isoformat()
+
+
+def parse_date(text: str) -> Optional[datetime.datetime]:
+    text = text.strip()
+    if not _DATE_SHAPE.match(text):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_date(value):
+    """ISO text for date-like values; anything unparseable is returned unchanged"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return iso_date(value)
+    if isinstance(value, str) and (parsed := parse_date(value)) is not None:
+        return iso_date(parsed)
+    return value
+
+
+def to_excel_date(value):
+    """Inverse of normalize_date for export: ISO text back to a datetime cell"""
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+class ColumnProfile:
+    """Running statistics for one column, fed with raw cell values while a sheet streams"""
+
+    __slots__ = ("integers", "reals", "dates", "date_texts", "texts", "nulls", "distinct", "_distinct_overflow")
+
+    def __init__(self):
+        self.integers = 0
+        self.reals = 0
+        self.dates = 0       # datetime cells
+        self.date_texts = 0  # text cells in a recognised date layout
+        self.texts = 0       # other text
+        self.nulls = 0
+        self.distinct = set()
+        self._distinct_overflow = False
+
+    def add(self, value):
+        if value is None:
+            self.nulls += 1
+            return
+        if isinstance(value, bool) or isinstance(value, int):
+            self.integers += 1
+        elif isinstance(value, float):
+            self.reals += 1
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            self.dates += 1
+        elif isinstance(value, str):
+            if parse_date(value) is not None:
+                self.date_texts += 1
+            else:
+                self.texts += 1
+        else:
+            self.texts += 1
+        if not self._distinct_overflow:
+            self.distinct.add(value)
+            if len(self.distinct) > CATEGORY_MAX_DISTINCT:
+                self._distinct_overflow = True
+                self.distinct = set()
+
+    @property
+    def non_null(self) -> int:
+        return self.integers + self.reals + self.dates + self.date_texts + self.texts
+
+    def infer(self) -> Tuple[str, List[str]]:
+        """(column type, problems found) for the values seen"""
+        total = self.non_null
+        if not total:
+            return "empty", []
+        numbers = self.integers + self.reals
+        dates = self.dates + self.date_texts
+        if numbers == total:
+            return ("integer" if not self.reals else "real"), []
+        if dates == total:
+            return "date", []
+        if dates and dates >= DATE_MIN_SHARE * total:
+            return "date", [f"{total - dates} value(s) not recognised as dates"]
+        if not numbers and not self.dates:
+            # Date-looking strings in a text column (e.g. a few notes) stay text
+            if (
+                not self._distinct_overflow
+                and total >= 2 * len(self.distinct)
+            ):
+                return "category", []
+            return "text", []
+        kinds = [
+            f"{count} {name}" for name, count in
+            (("number(s)", numbers), ("date(s)", dates), ("text value(s)", self.texts))
+            if count
+        ]
+        return "mixed", [f"mixed types: {', '.join(kinds)}"]
+
+
+def infer_schema(columns: List[str], profiles: List[ColumnProfile], rows: int) -> Tuple[Dict, List[str]]:
+    """
+    Column types for a staged sheet plus a list of non-conformance messages.
+
+    The asset_tag column is typed as text; duplicates or blanks are reported
+    (and mean the NOT NULL/UNIQUE constraints can't be applied).
+    """
+    schema, issues = {}, []
+    for column, profile in zip(columns, profiles):
+        column_type, problems = profile.infer()
+        if column == "asset_tag":
+            column_type, problems = "text", []
+            if profile.nulls:
+                issues.append(f"asset_tag: {profile.nulls} row(s) without a tag")
+        schema[column] = column_type
+        issues.extend(f"{column}: {problem}" for problem in problems)
+    if "asset_tag" not in schema and rows:
+        issues.append("no asset_tag column; rows can't be looked up or reassigned")
+    return schema, issues
+
+
+def column_definition(quoted_name: str, column_type: str, not_null: bool = False) -> str:
+    definition = f"{quoted_name} {AFFINITIES.get(column_type, '')}".rstrip()
+    return definition + (" NOT NULL" if not_null else "")
@@ -0,0 +1,168 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SyncScheduler:
+    """
+    Background worker for SQLite -> Excel exports.
+
+    A single worker thread runs one export at a time. Requests that arrive
+    while a job is queued are merged into it; requests that arrive while a job
+    is running queue at most one follow-up. Write notifications are debounced
+    (but never delayed past ``max_delay_seconds``), and an optional interval
+    triggers periodic exports.
+    """
+
+    def __init__(
+        self,
+        export_func: Callable,
+        debounce_seconds: float = 2.0,
+        max_delay_seconds: float = 30.0,
+        interval_seconds: Optional[float] = None,
+        history: int = 100,
+    ):
+        self.export_func = export_func
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.interval_seconds = interval_seconds
+        self.history = history
+
+        self._cond = threading.Condition()
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending: Optional[Dict] = None
+        self._running: Optional[Dict] = None
+        self._last_finished = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def _new_job(self, reason: str, run_after: float) -> Dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "reasons": [reason],
+            "requests": 1,
+            "progress": None,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_seconds": None,
+            "result": None,
+            "error": None,
+            "_run_after": run_after,
+            "_immediate": False,
+            "_deadline": time.monotonic() + self.max_delay_seconds,
+        }
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self.history:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest] in (self._pending, self._running):
+                break
+            self._jobs.popitem(last=False)
+        return job
+
+    def _enqueue(self, reason: str, delay: float) -> Dict:
+        now = time.monotonic()
+        with self._cond:
+            if self._pending is not None:
+                job = self._pending
+                job["requests"] += 1
+                if reason not in job["reasons"]:
+                    job["reasons"].append(reason)
+                if not delay:
+                    # Manual requests run as soon as possible
+                    job["_run_after"] = now
+                    job["_immediate"] = True
+                elif not job["_immediate"]:
+                    # Debounced writes push the run back, but never past the deadline
+                    job["_run_after"] = min(job["_deadline"], now + delay)
+            else:
+                job = self._pending = self._new_job(reason, now + delay)
+                job["_immediate"] = not delay
+            self._cond.notify()
+            return self.public(job)
+
+    def request(self, reason: str = "manual") -> Dict:
+        """Queue an export to run as soon as the worker is free"""
+        return self._enqueue(reason, 0.0)
+
+    def notify_change(self) -> Dict:
+        """Record a database write; bursts of writes collapse into one export"""
+        return self._enqueue("write", self.debounce_seconds)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return self.public(job) if job else None
+
+    @staticmethod
+    def public(job: Dict) -> Dict:
+        return {k: (list(v) if isinstance(v, list) else v) for k, v in job.items() if not k.startswith("_")}
+
+    def _set_progress(self, job: Dict, message: str):
+        with self._cond:
+            job["progress"] = message
+
+    def _run(self, job: Dict):
+        started = time.monotonic()
+        with self._cond:
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+        try:
+            result = self.export_func(progress=lambda message: self._set_progress(job, message))
+            outcome = {"status": "succeeded", "result": result}
+        except Exception as e:
+            logger.error(f"Sync job {job['job_id']} failed: {e}")
+            outcome = {"status": "failed", "error": getattr(e, "detail", None) or str(e)}
+        with self._cond:
+            job.update(outcome)
+            job["finished_at"] = datetime.now().isoformat()
+            job["duration_seconds"] = round(time.monotonic() - started, 3)
+            self._running = None
+            self._last_finished = time.monotonic()
+        logger.info(f"Sync job {job['job_id']} {job['status']} in {job['duration_seconds']}s")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.monotonic()
+                    if self._pending is None and self.interval_seconds:
+                        if now - self._last_finished >= self.interval_seconds:
+                            self._pending = self._new_job("scheduled", now)
+                    if self._pending is not None and self._pending["_run_after"] <= now:
+                        job, self._pending = self._pending, None
+                        self._running = job
+                        break
+                    timeouts = []
+                    if self._pending is not None:
+                        timeouts.append(self._pending["_run_after"] - now)
+                    if self.interval_seconds:
+                        timeouts.append(self.interval_seconds - (now - self._last_finished))
+                    self._cond.wait(timeout=max(0.01, min(timeouts)) if timeouts else None)
+            self._run(job)
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._worker, name="sync-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after the running job (queued jobs are dropped)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
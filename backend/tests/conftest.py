@@ -0,0 +1,53 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADER = ["Asset Tag", "User Name", "User ID", "Department", "Location", "Date Of Return"]
+ROWS = [
+    ["A001", "Alice", "U1001", "IT", "Chennai", datetime.datetime(2030, 1, 10)],
+    ["A002", "Bob", "U1002", "HR", "Chennai", None],
+    ["A003", None, None, "IT", "Mumbai", None],
+    ["A004", "Dan", "U1004", "Finance", "Mumbai", datetime.datetime(2030, 2, 1)],
+    ["A005", "Eve", "U1005", "IT", "Delhi", None],
+    ["A006", "Frank", "U1006", "HR", "Delhi", None],
+]
+
+
+def write_workbook(path, rows, header=HEADER, title="laptops"):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = title
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    # Backups are written under the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "assets.xlsx"
+
+
+@pytest.fixture
+def make_sync(workbook, tmp_path):
+    """Write the workbook (default rows unless given) and import it"""
+    from excel_processor import ExcelSQLiteSync
+
+    def make(rows=ROWS, header=HEADER):
+        write_workbook(workbook, rows, header)
+        return ExcelSQLiteSync(str(workbook), str(tmp_path / "assets.db"))
+
+    return make
+
+
+@pytest.fixture
+def sync(make_sync):
+    return make_sync()
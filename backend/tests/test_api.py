@@ -0,0 +1,178 @@
+import datetime
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import ROWS, write_workbook
+
+ORIGIN = "http://localhost:5173"
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """(main module, client) for an app warmed up on the test workbook"""
+    root = tmp_path_factory.mktemp("api")
+    write_workbook(root / "assets.xlsx", ROWS)
+    with pytest.MonkeyPatch.context() as mp:
+        # users.db and backups/ are created under the working directory
+        mp.chdir(root)
+        mp.setenv("ASSET_EXCEL_PATH", str(root / "assets.xlsx"))
+        mp.setenv("ASSET_DB_PATH", str(root / "assets.db"))
+        import main
+
+        mp.setattr(main, "WATCH_EXCEL_FILE", False)
+        mp.setattr(main, "SYNC_AFTER_WRITES", False)
+        with TestClient(main.app) as client:
+            deadline = time.monotonic() + 30
+            while client.get("/ready").status_code != 200:
+                assert time.monotonic() < deadline, client.get("/ready").json()
+                time.sleep(0.05)
+            yield main, client
+
+
+@pytest.fixture
+def client(api):
+    return api[1]
+
+
+@pytest.fixture
+def admin(client):
+    return auth(login(client, "admin", "admin123"))
+
+
+def login(client, username, password):
+    response = client.post("/token", data={"username": username, "password": password})
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def auth(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_warm_up_gate(api, monkeypatch):
+    main, client = api
+    monkeypatch.setitem(main.warmup, "status", "starting")
+    response = client.get("/assets/summary", headers={"Origin": ORIGIN})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    # CORS wraps the gate, so the browser can read the 503
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    preflight = client.options("/token", headers={"Origin": ORIGIN, "Access-Control-Request-Method": "POST"})
+    assert preflight.status_code == 200
+    assert client.get("/ready").status_code == 503
+    assert client.get("/metrics").status_code == 200
+
+    # A failed warm-up only asks clients to retry while another attempt is scheduled
+    monkeypatch.setitem(main.warmup, "status", "failed")
+    assert "retry-after" not in client.get("/assets/summary").headers
+    retry_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=5)
+    monkeypatch.setitem(main.warmup, "retry_at", retry_at.isoformat())
+    assert 1 <= int(client.get("/assets/summary").headers["retry-after"]) <= 5
+
+
+def test_asset_etag_and_conditional_requests(client, admin):
+    response = client.get("/assets/A001", headers=admin)
+    assert response.status_code == 200
+    assert response.json()[0]["user_name"] == "Alice"
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert client.get("/assets/A001", headers={**admin, "If-None-Match": etag}).status_code == 304
+    assert client.get("/assets/A001", headers={**admin, "If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/assets/NOPE", headers=admin).status_code == 404
+
+    response = client.put("/assets/A001/reassign", headers=admin, json={"user_name": "Alicia"})
+    assert response.status_code == 200
+    response = client.get("/assets/A001", headers={**admin, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["user_name"] == "Alicia"
+
+    assert client.put("/assets/A001/reassign", headers=admin, json={}).status_code == 400
+    assert client.put("/assets/NOPE/reassign", headers=admin, json={"user_name": "X"}).status_code == 404
+
+
+def test_list_assets_cursor_pagination(client, admin):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/assets", headers=admin, params=params).json()
+        seen.extend(item["asset_tag"] for item in page["items"])
+        if (cursor := page["next_cursor"]) is None:
+            break
+    assert seen == ["A001", "A002", "A003", "A004", "A005", "A006"]
+
+    page = client.get("/assets", headers=admin, params={"department": "HR", "order": "desc"}).json()
+    assert [item["asset_tag"] for item in page["items"]] == ["A006", "A002"]
+    assert client.get("/assets", headers=admin, params={"order": "sideways"}).status_code == 400
+    assert client.get("/assets", headers=admin, params={"colour": "red"}).status_code == 400
+
+
+def test_bulk_lookup_and_reassign(api, admin, monkeypatch):
+    main, client = api
+    response = client.post("/assets/lookup", headers=admin, json={"asset_tags": ["A002", "NOPE"]})
+    assert response.status_code == 200
+    assert response.json()["results"]["A002"][0]["user_name"] == "Bob"
+    assert response.json()["not_found"] == ["NOPE"]
+
+    response = client.post("/assets/reassign", headers=admin, json={"items": [
+        {"asset_tag": "A002", "user_name": "Bobby"},
+        {"asset_tag": "A003", "location": "Pune"},
+        {"asset_tag": "NOPE", "user_name": "X"},
+    ]})
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    assert {r["asset_tag"]: r["status"] for r in response.json()["results"]}["NOPE"] == "not_found"
+    assert client.get("/assets/A002", headers=admin).json()[0]["user_name"] == "Bobby"
+
+    assert client.post("/assets/lookup", headers=admin, json={"asset_tags": []}).status_code == 400
+    monkeypatch.setattr(main, "BULK_MAX_ITEMS", 1)
+    assert client.post("/assets/lookup", headers=admin, json={"asset_tags": ["A1", "A2"]}).status_code == 413
+
+
+def test_refresh_token_rotation_and_reuse(client):
+    tokens = login(client, "admin", "admin123")
+    response = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert client.get("/users/me", headers=auth(rotated)).json()["username"] == "admin"
+
+    # Replaying the old refresh token revokes the session it was rotated into
+    assert client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/token/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+    assert client.post("/token/refresh", json={"refresh_token": rotated["access_token"]}).status_code == 401
+
+
+def test_revoked_refresh_token_is_rejected(client):
+    tokens = login(client, "admin", "admin123")
+    assert client.post("/token/revoke", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_user_changes_apply_to_existing_tokens(client, admin):
+    user = {"username": "dana", "password": "dana-pass", "role": "user"}
+    assert client.post("/register", headers=admin, json=user).status_code == 201
+    assert client.post("/register", headers=admin, json=user).status_code == 400
+    tokens = login(client, "dana", "dana-pass")
+    assert client.get("/users/me", headers=auth(tokens)).status_code == 200
+    assert client.get("/assets/summary", headers=auth(tokens)).status_code == 403
+
+    # The cached user record is evicted, so this applies to the next request
+    assert client.put("/users/dana", headers=admin, json={"disabled": True}).status_code == 200
+    assert client.get("/users/me", headers=auth(tokens)).status_code == 400
+    assert client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    assert client.put("/users/dana", headers=admin, json={"disabled": False, "role": "admin"}).status_code == 200
+    # Tokens issued for the old role no longer match the user
+    assert client.get("/users/me", headers=auth(tokens)).status_code == 401
+    assert client.get("/assets/summary", headers=auth(login(client, "dana", "dana-pass"))).status_code == 200
+
+
+def test_failed_logins_are_throttled(client):
+    for _ in range(5):
+        response = client.post("/token", data={"username": "mallory", "password": "guess"})
+        assert response.status_code == 401
+    response = client.post("/token", data={"username": "mallory", "password": "guess"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
@@ -0,0 +1,76 @@
+import gzip
+import os
+import sqlite3
+
+from backup_store import BackupStore
+
+
+def stored_objects(store):
+    return sorted(name for _, _, names in os.walk(store.objects_dir) for name in names)
+
+
+def test_unchanged_file_is_stored_once(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    path = tmp_path / "notes.txt"
+    path.write_text("v1")
+
+    first = store.snapshot_file(str(path))
+    assert store.snapshot_file(str(path))["id"] == first["id"]
+    # Stored gzipped, since text isn't already compressed
+    with gzip.open(first["object_path"], "rt") as f:
+        assert f.read() == "v1"
+
+    path.write_text("v2")
+    assert store.snapshot_file(str(path))["id"] != first["id"]
+    assert len(store.list("notes.txt")) == 2
+    assert len(stored_objects(store)) == 2
+    assert store.snapshot_file(str(tmp_path / "missing.txt")) is None
+
+
+def test_retention_keeps_newest_and_collects_objects(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"), keep_last=2, keep_daily=0, keep_weekly=0)
+    path = tmp_path / "notes.txt"
+    for version in range(4):
+        path.write_text(f"v{version}")
+        store.snapshot_file(str(path))
+
+    kept = store.list("notes.txt")
+    assert len(kept) == 2
+    assert stored_objects(store) == sorted(s["object_name"] for s in kept)
+    with gzip.open(kept[0]["object_path"], "rt") as f:
+        assert f.read() == "v3"
+
+
+def test_restore(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    path = tmp_path / "notes.txt"
+    path.write_text("original")
+    snapshot = store.snapshot_file(str(path))
+    path.write_text("overwritten")
+
+    assert store.restore(snapshot["id"]) == str(path)
+    assert path.read_text() == "original"
+    copy = tmp_path / "copy.txt"
+    store.restore(snapshot["id"], str(copy))
+    assert copy.read_text() == "original"
+
+
+def test_sqlite_snapshot_restores_live_database(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    db_path = str(tmp_path / "live.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+
+    # Taken while the connection is open, with the data still in the WAL
+    snapshot = store.snapshot_sqlite(db_path)
+    assert snapshot["source"] == "live.db"
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+
+    store.restore(snapshot["id"])
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+
+import login_throttle
+from login_throttle import LoginThrottle
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced monotonic clock for the throttle module"""
+    now = [1000.0]
+    monkeypatch.setattr(login_throttle, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+
+    def advance(seconds):
+        now[0] += seconds
+
+    return advance
+
+
+def fail(throttle, key, times):
+    for _ in range(times):
+        throttle.record_failure(key)
+
+
+def test_locks_out_after_max_failures(clock):
+    throttle = LoginThrottle(max_failures=3, lockout_seconds=30)
+    fail(throttle, "alice", 2)
+    assert throttle.retry_after("alice") == 0
+
+    throttle.record_failure("alice")
+    assert throttle.retry_after("alice") == 30
+    assert throttle.retry_after("bob") == 0
+    clock(31)
+    assert throttle.retry_after("alice") == 0
+
+
+def test_lockout_doubles_up_to_max(clock):
+    throttle = LoginThrottle(max_failures=3, lockout_seconds=30, max_lockout_seconds=100)
+    fail(throttle, "alice", 4)
+    assert throttle.retry_after("alice") == 60
+    throttle.record_failure("alice")
+    assert throttle.retry_after("alice") == 100
+
+
+def test_failures_outside_window_start_over(clock):
+    throttle = LoginThrottle(max_failures=3, window_seconds=60)
+    fail(throttle, "alice", 2)
+    clock(61)
+    fail(throttle, "alice", 2)
+    assert throttle.retry_after("alice") == 0
+
+
+def test_reset_and_stats(clock):
+    throttle = LoginThrottle(max_failures=1, lockout_seconds=30, maxsize=2)
+    fail(throttle, "alice", 1)
+    fail(throttle, "bob", 1)
+    throttle.retry_after("alice")
+    assert throttle.stats() == {"tracked": 2, "locked": 2, "throttled": 1}
+
+    throttle.reset("alice")
+    assert throttle.retry_after("alice") == 0
+    # Only the most recently failing keys are tracked
+    fail(throttle, "carol", 1)
+    fail(throttle, "dave", 1)
+    assert throttle.retry_after("bob") == 0
+    assert throttle.stats()["tracked"] == 2
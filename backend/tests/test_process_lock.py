@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import threading
+
+from process_lock import InterProcessLock, LeaderElection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def try_lock_in_subprocess(path):
+    """Whether another process can take the lock right now"""
+    code = (
+        "import sys; from process_lock import InterProcessLock; "
+        "sys.exit(0 if InterProcessLock(sys.argv[1]).acquire(blocking=False) else 1)"
+    )
+    result = subprocess.run([sys.executable, "-c", code, path], cwd=BACKEND_DIR)
+    return result.returncode == 0
+
+
+def test_lock_is_reentrant_and_excludes_other_threads(tmp_path):
+    lock = InterProcessLock(str(tmp_path / "workbook.lock"))
+    acquired = []
+
+    with lock:
+        with lock:
+            thread = threading.Thread(target=lambda: acquired.append(lock.acquire(timeout=0.1)))
+            thread.start()
+            thread.join()
+        assert acquired == [False]
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_lock_excludes_other_processes(tmp_path):
+    path = str(tmp_path / "workbook.lock")
+    lock = InterProcessLock(path)
+    with lock:
+        assert not try_lock_in_subprocess(path)
+    assert try_lock_in_subprocess(path)
+
+
+def test_leader_election_hands_over(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    leader, follower = LeaderElection(path, retry_seconds=0.05), LeaderElection(path, retry_seconds=0.05)
+    elected = threading.Event()
+    calls = []
+
+    leader.start(calls.append)
+    assert leader.is_leader and calls == [True]
+
+    def on_elected(initial):
+        calls.append(initial)
+        elected.set()
+
+    follower.start(on_elected)
+    assert not follower.is_leader
+    leader.stop()
+    # The follower takes over on its next retry, not as the initial leader
+    assert elected.wait(5)
+    assert follower.is_leader and calls == [True, False]
+    follower.stop()
@@ -0,0 +1,253 @@
+import datetime
+import sqlite3
+import threading
+
+from openpyxl import load_workbook
+
+from excel_processor import ExcelSQLiteSync
+from export_formats import encode_export
+
+
+def edit_workbook(path, edit):
+    wb = load_workbook(path)
+    edit(wb["laptops"])
+    wb.save(path)
+
+
+def find_row(ws, tag):
+    return next(row for row in ws.iter_rows(min_row=2) if row[0].value == tag)
+
+
+def table_rows(sync, table="laptops"):
+    with sqlite3.connect(sync.db_path) as conn:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY asset_tag").fetchall()
+
+
+def recount(sync):
+    """Summary counts recomputed from the asset table"""
+    with sqlite3.connect(sync.db_path) as conn:
+        counts = {}
+        for dimension, expression in (
+            ("department", "department"),
+            ("location", "location"),
+            ("assignment", "CASE WHEN COALESCE(user_id, '') != '' OR COALESCE(user_name, '') != '' "
+                           "THEN 'assigned' ELSE 'unassigned' END"),
+        ):
+            for value, count in conn.execute(f"SELECT {expression}, COUNT(*) FROM laptops GROUP BY 1"):
+                counts.setdefault(dimension, {})[value] = count
+        return counts
+
+
+def summary_counts(sync):
+    summary = sync.get_summary()
+    return {
+        "department": {r["department"]: r["count"] for r in summary["by_department"]},
+        "location": {r["location"]: r["count"] for r in summary["by_location"]},
+        "assignment": {k: v for k, v in summary["assignment"].items() if v},
+    }
+
+
+def search_index_rowids(sync, table="laptops"):
+    with sqlite3.connect(sync.db_path) as conn:
+        indexed = {r[0] for r in conn.execute(f"SELECT rowid FROM _search_{table}")}
+        rows = {r[0] for r in conn.execute(f"SELECT rowid FROM {table}")}
+    return indexed, rows
+
+
+def tags(assets):
+    return sorted(a["asset_tag"] for a in assets)
+
+
+def test_import(sync):
+    assert len(table_rows(sync)) == 6
+    asset = sync.get_asset_by_tag("A001")[0]
+    assert asset["user_name"] == "Alice"
+    assert asset["date_of_return"].startswith("2030-01-10")
+    assert sync.get_summary()["total"] == 6
+    assert summary_counts(sync) == recount(sync)
+
+
+def test_incremental_import_edit_delete_insert(sync, workbook):
+    version_a001 = sync.get_versioned_asset("A001")["version"]
+    version_a002 = sync.get_versioned_asset("A002")["version"]
+
+    def edit(ws):
+        find_row(ws, "A002")[1].value = "Bobby"
+        ws.delete_rows(find_row(ws, "A003")[0].row)
+        ws.append(["A007", "Grace", "U1007", "Finance", "Pune", None])
+
+    edit_workbook(workbook, edit)
+    result = sync.excel_to_sqlite()
+    sheet = result["sheets"]["laptops"]
+    assert sheet["mode"] == "incremental"
+    assert (sheet["inserted"], sheet["updated"], sheet["deleted"]) == (1, 1, 1)
+
+    assert sync.get_asset_by_tag("A002")[0]["user_name"] == "Bobby"
+    assert sync.get_asset_by_tag("A003") == []
+    assert sync.get_asset_by_tag("A007")[0]["location"] == "Pune"
+
+    # Versions move only for the edited row
+    assert sync.get_versioned_asset("A001")["version"] == version_a001
+    assert sync.get_versioned_asset("A002")["version"] > version_a002
+
+    assert sync.get_summary()["total"] == 6
+    assert summary_counts(sync) == recount(sync)
+    assert summary_counts(sync)["assignment"] == {"assigned": 6}
+
+
+def test_search_after_incremental_import(sync, workbook):
+    assert tags(sync.search_assets("Mumbai")) == ["A003", "A004"]
+
+    def edit(ws):
+        ws.delete_rows(find_row(ws, "A003")[0].row)
+        find_row(ws, "A005")[4].value = "Mumbai"
+
+    edit_workbook(workbook, edit)
+    sync.excel_to_sqlite()
+
+    assert tags(sync.search_assets("Mumbai")) == ["A004", "A005"]
+    assert tags(sync.search_assets("Delhi")) == ["A006"]
+    # No index entries are left behind for deleted rows
+    indexed, rows = search_index_rowids(sync)
+    assert indexed == rows
+
+
+def test_deleting_rows_keeps_no_search_orphans(sync, workbook):
+    edit_workbook(workbook, lambda ws: ws.delete_rows(2, 3))
+    sync.excel_to_sqlite()
+
+    indexed, rows = search_index_rowids(sync)
+    assert len(rows) == 3
+    assert indexed == rows
+    assert sync.search_assets("Alice") == []
+
+
+def test_reassign_bumps_version_and_summary(sync):
+    before = sync.get_versioned_asset("A003")
+    assert before["assets"][0]["user_name"] is None
+
+    assert sync.reassign_asset("A003", {"user_name": "Carol", "location": "Pune"})
+
+    after = sync.get_versioned_asset("A003")
+    assert after["version"] == before["version"] + 1
+    assert after["etag"] != before["etag"]
+    assert after["assets"][0]["user_name"] == "Carol"
+    assert summary_counts(sync) == recount(sync)
+    assert summary_counts(sync)["location"]["Pune"] == 1
+
+
+def test_lookup_racing_a_write_is_not_cached(sync, monkeypatch):
+    read_rows = sync.get_asset_by_tag
+
+    def read_then_write(tag):
+        rows = read_rows(tag)
+        # Commits (and evicts) after the lookup's snapshot, before it caches
+        writer = threading.Thread(target=sync.reassign_asset, args=(tag, {"user_name": "Zed"}))
+        writer.start()
+        writer.join()
+        return rows
+
+    monkeypatch.setattr(sync, "get_asset_by_tag", read_then_write)
+    assert sync.get_versioned_asset("A001")["assets"][0]["user_name"] == "Alice"
+    monkeypatch.undo()
+
+    assert sync.asset_cache.get("A001") is None
+    assert sync.get_versioned_asset("A001")["assets"][0]["user_name"] == "Zed"
+
+
+def test_cached_lookup_sees_writes_from_another_process(sync, workbook, tmp_path):
+    assert sync.get_versioned_asset("A002")["assets"][0]["user_name"] == "Bob"
+    assert sync.asset_cache.get("A002") is not None
+
+    other = ExcelSQLiteSync(str(workbook), str(tmp_path / "assets.db"), import_on_init=False)
+    other.reassign_asset("A002", {"user_name": "Bobby"})
+
+    # Still cached here, but the stored version moved on
+    assert sync.get_versioned_asset("A002")["assets"][0]["user_name"] == "Bobby"
+
+
+def test_incremental_export_patches_changed_rows(sync, workbook):
+    sync.reassign_asset("A004", {"user_name": "Dana", "date_of_return": "2031-03-04"})
+    result = sync.sqlite_to_excel()
+    assert result["mode"] == "incremental"
+
+    ws = load_workbook(workbook)["laptops"]
+    row = [c.value for c in find_row(ws, "A004")]
+    assert row[1] == "Dana"
+    assert row[5] == datetime.datetime(2031, 3, 4)
+    assert [c.value for c in find_row(ws, "A005")][1] == "Eve"
+
+    # Nothing left to export, and re-reading the workbook changes nothing
+    assert sync.sqlite_to_excel()["mode"] == "unchanged"
+    before = table_rows(sync)
+    sync.excel_to_sqlite()
+    assert table_rows(sync) == before
+
+
+def test_incremental_export_writes_dates_as_date_cells(sync, workbook):
+    # A002 has no return date, so its cell has no date format to reuse
+    sync.reassign_asset("A002", {"date_of_return": "2031-03-04"})
+    assert sync.sqlite_to_excel()["mode"] == "incremental"
+
+    wb = load_workbook(workbook)
+    cell = find_row(wb["laptops"], "A002")[5]
+    assert cell.is_date
+    assert cell.value == datetime.datetime(2031, 3, 4)
+    assert cell.number_format == "yyyy-mm-dd h:mm:ss"
+    # Existing date cells keep their own style
+    assert find_row(wb["laptops"], "A001")[5].value == datetime.datetime(2030, 1, 10)
+
+
+def test_export_falls_back_to_full_when_tag_changed_in_excel(make_sync, workbook):
+    # Without date columns the full export writes the fetched rows as they come
+    sync = make_sync(
+        rows=[["A001", "Alice", "IT"], ["A002", "Bob", "HR"]], header=["Asset Tag", "User Name", "Department"]
+    )
+    sync.reassign_asset("A002", {"user_name": "Bobby"})
+    # The reassigned row's tag no longer matches the workbook
+    edit_workbook(workbook, lambda ws: setattr(find_row(ws, "A002")[0], "value", "X002"))
+
+    result = sync.sqlite_to_excel()
+    assert result["mode"] == "full"
+    ws = load_workbook(workbook)["laptops"]
+    assert [c.value for c in find_row(ws, "A002")][1] == "Bobby"
+    # The connection is still usable for tuple rows afterwards
+    assert sync.get_asset_by_tag("A002")[0]["user_name"] == "Bobby"
+
+
+def test_export_with_duplicate_tags_rewrites_whole_workbook(make_sync, workbook):
+    sync = make_sync(
+        rows=[["A1", "Alice", "IT"], ["A1", "Bob", "HR"], ["A2", "Carol", "IT"]],
+        header=["Asset Tag", "User Name", "Department"],
+    )
+    sync.reassign_asset("A1", {"user_name": "Zed"})
+
+    # The tag can't tell the two A1 rows apart, so patching in place could hit the wrong one
+    assert sync.sqlite_to_excel()["mode"] == "full"
+    ws = load_workbook(workbook)["laptops"]
+    assert [[c.value for c in row] for row in ws.iter_rows(min_row=2)] == [
+        ["A1", "Zed", "IT"], ["A1", "Bob", "HR"], ["A2", "Carol", "IT"]
+    ]
+
+
+def test_list_assets_keyset_pagination(sync):
+    seen, cursor = [], None
+    while True:
+        page = sync.list_assets(limit=4, cursor=cursor)
+        seen.extend(row["asset_tag"] for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["A001", "A002", "A003", "A004", "A005", "A006"]
+
+    page = sync.list_assets(filters={"department": "IT"}, sort="location", descending=True)
+    assert [row["asset_tag"] for row in page["items"]] == ["A003", "A005", "A001"]
+
+
+def test_streaming_export(sync):
+    sync.reassign_asset("A001", {"user_name": "Alicia"})
+    export = sync.prepare_export("laptops", columns=["asset_tag", "user_name"], filters={"location": "Chennai"})
+    data = b"".join(
+        encode_export("csv", export["columns"], export["column_types"], sync.iter_export(export, chunk_size=1))
+    )
+    assert data.decode().splitlines() == ["asset_tag,user_name", "A001,Alicia", "A002,Bob"]
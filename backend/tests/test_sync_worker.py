@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from sync_worker import SyncScheduler
+
+
+class Export:
+    """Export function that records calls and can be held mid-run"""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, progress):
+        self.calls += 1
+        progress(f"call {self.calls}")
+        self.started.set()
+        self.release.wait(5)
+        return {"call": self.calls}
+
+
+@pytest.fixture
+def export():
+    return Export()
+
+
+@pytest.fixture
+def make_scheduler(export):
+    schedulers = []
+
+    def make(export_func=export, **kwargs):
+        scheduler = SyncScheduler(export_func, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.stop(timeout=5)
+
+
+def wait_for(scheduler, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (job := scheduler.status(job_id))["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline, job
+        time.sleep(0.01)
+    return job
+
+
+def test_requests_merge_into_queued_job(make_scheduler, export):
+    scheduler = make_scheduler(debounce_seconds=60)
+    first = scheduler.notify_change()
+    assert scheduler.notify_change()["job_id"] == first["job_id"]
+    # A manual request joins the pending job and makes it run right away
+    job = scheduler.request()
+    assert job["job_id"] == first["job_id"]
+    assert job["requests"] == 3
+    assert job["reasons"] == ["write", "manual"]
+
+    scheduler.start()
+    job = wait_for(scheduler, job["job_id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"call": 1}
+    assert job["progress"] == "call 1"
+    assert export.calls == 1
+
+
+def test_requests_during_a_run_queue_one_follow_up(make_scheduler, export):
+    scheduler = make_scheduler()
+    scheduler.start()
+    export.release.clear()
+    running = scheduler.request()
+    assert export.started.wait(5)
+
+    follow_ups = {scheduler.request()["job_id"] for _ in range(3)}
+    assert len(follow_ups) == 1 and running["job_id"] not in follow_ups
+    assert scheduler.status(running["job_id"])["status"] == "running"
+
+    export.release.set()
+    assert wait_for(scheduler, follow_ups.pop())["requests"] == 3
+    assert export.calls == 2
+
+
+def test_writes_are_debounced_but_not_past_max_delay(make_scheduler, export):
+    scheduler = make_scheduler(debounce_seconds=0.2, max_delay_seconds=0.3)
+    scheduler.start()
+    started = time.monotonic()
+    job = scheduler.notify_change()
+    # Keep writing: each write pushes the export back, up to the deadline
+    while scheduler.status(job["job_id"])["status"] == "queued" and time.monotonic() - started < 2:
+        scheduler.notify_change()
+        time.sleep(0.05)
+
+    assert wait_for(scheduler, job["job_id"])["status"] == "succeeded"
+    assert time.monotonic() - started < 1
+    assert export.calls == 1
+
+
+def test_failed_export_is_reported(make_scheduler):
+    def broken(progress):
+        raise RuntimeError("workbook is locked")
+
+    scheduler = make_scheduler(broken)
+    scheduler.start()
+    job = wait_for(scheduler, scheduler.request()["job_id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "workbook is locked"
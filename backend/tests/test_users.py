@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from users_db import UserDB
+
+
+@pytest.fixture
+def users(tmp_path):
+    db = UserDB(str(tmp_path / "users.db"), seed_admin=False)
+    # A precomputed hash keeps bcrypt out of the tests that don't log in
+    db.create_user("alice", hashed_password="not-a-real-hash", role="user")
+    return db
+
+
+def login(users, jti, username="alice", ttl=60):
+    users.record_login(username, jti, time.time() + ttl)
+
+
+def test_authenticate_user(users):
+    users.create_user("bob", password="secret")
+    assert users.authenticate_user("bob", "secret")["username"] == "bob"
+    assert users.authenticate_user("bob", "wrong") is None
+    assert users.authenticate_user("nobody", "secret") is None
+
+
+def test_refresh_token_rotation(users):
+    login(users, "j1")
+    assert users.rotate_refresh_token("j1", "alice", "j2", time.time() + 60) == "rotated"
+    assert users.rotate_refresh_token("j2", "alice", "j3", time.time() + 60) == "rotated"
+
+    # Unknown, someone else's and expired tokens are just invalid
+    assert users.rotate_refresh_token("nope", "alice", "j4", time.time() + 60) == "invalid"
+    assert users.rotate_refresh_token("j3", "bob", "j4", time.time() + 60) == "invalid"
+    login(users, "old", ttl=-1)
+    assert users.rotate_refresh_token("old", "alice", "j4", time.time() + 60) == "invalid"
+
+
+def test_reused_refresh_token_revokes_every_session(users):
+    login(users, "j1")
+    login(users, "other-device")
+    assert users.rotate_refresh_token("j1", "alice", "j2", time.time() + 60) == "rotated"
+
+    # j1 was already exchanged: it has probably leaked
+    assert users.rotate_refresh_token("j1", "alice", "j3", time.time() + 60) == "reused"
+    assert users.rotate_refresh_token("j2", "alice", "j4", time.time() + 60) != "rotated"
+    assert users.rotate_refresh_token("other-device", "alice", "j5", time.time() + 60) != "rotated"
+
+
+def test_revoke_refresh_token(users):
+    login(users, "j1")
+    assert users.revoke_refresh_token("j1", "alice")
+    assert not users.revoke_refresh_token("j1", "alice")
+    assert users.rotate_refresh_token("j1", "alice", "j2", time.time() + 60) != "rotated"
+
+
+def test_update_user_evicts_cached_record(users):
+    assert users.get_user("alice")["role"] == "user"
+    assert users.get_cached_user("alice") is not None
+
+    assert users.update_user("alice", role="admin", full_name="Alice A")
+    assert users.get_cached_user("alice") is None
+    assert users.get_user("alice")["role"] == "admin"
+
+    # Cached copies are handed out as copies
+    users.get_user("alice")["role"] = "user"
+    assert users.get_user("alice")["role"] == "admin"
+
+
+def test_disabling_user_revokes_sessions(users):
+    login(users, "j1")
+    users.get_user("alice")
+    assert users.update_user("alice", disabled=True)
+    assert users.get_user("alice")["disabled"]
+    assert users.rotate_refresh_token("j1", "alice", "j2", time.time() + 60) != "rotated"
+
+    # Profile-only changes leave sessions alone
+    login(users, "j3")
+    assert users.update_user("alice", email="alice@example.com")
+    assert users.rotate_refresh_token("j3", "alice", "j4", time.time() + 60) == "rotated"
+    assert not users.update_user("nobody", email="x@example.com")
@@ -3,16 +3,49 @@ import sqlite3
 from passlib.context import CryptContext
 from typing import Optional, Dict
 from datetime import datetime
+import time
+from db_pool import get_pool
+from cache import TTLCache
+from metrics import histogram
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+PASSWORD_HASH_SECONDS = histogram(
+    "password_hash_duration_seconds", "bcrypt time per operation (including pool queueing)", ("operation",)
+)
+
+
+# Module-level so they can run in a process pool
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+# Columns that may be changed through update_user
+UPDATABLE_FIELDS = ("full_name", "email", "disabled", "role")
+
 class UserDB:
-    def __init__(self, db_path: str = "users.db"):
+    def __init__(
+        self,
+        db_path: str = "users.db",
+        cache_ttl: float = 30.0,
+        cache_size: int = 1024,
+        seed_admin: bool = True
+    ):
+        """With ``seed_admin=False`` the caller runs ensure_admin() later (it may need bcrypt)"""
         self.db_path = db_path
+        self.pool = get_pool(db_path)
+        # Short-lived user records for the per-request auth check; writes evict
+        self.user_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
         self._init_db()
+        if seed_admin:
+            self.ensure_admin()
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -26,20 +59,39 @@ class UserDB:
                     last_login TIMESTAMP
                 )
             """)
+            # Rotating refresh tokens; a revoked token presented again revokes the user's others
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS refresh_tokens (
+                    jti TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    revoked INTEGER NOT NULL DEFAULT 0,
+                    replaced_by TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_refresh_tokens_username ON refresh_tokens (username)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_refresh_tokens_expires ON refresh_tokens (expires_at)")
             conn.commit()
 
-            # Create admin user if not exists
-            if not self.get_user("admin"):
-                self.create_user(
-                    username="admin",
-                    password="admin123",  # Change this in production!
-                    full_name="Admin User",
-                    email="admin@example.com",
-                    role="admin"
-                )
+    def ensure_admin(self):
+        """Create the admin user if it doesn't exist"""
+        if not self.get_user("admin", use_cache=False):
+            self.create_user(
+                username="admin",
+                password="admin123",  # Change this in production!
+                full_name="Admin User",
+                email="admin@example.com",
+                role="admin"
+            )
 
-    def create_user(self, username: str, password: str, **kwargs):
-        with sqlite3.connect(self.db_path) as conn:
+    def _hash_password(self, password: str) -> str:
+        with PASSWORD_HASH_SECONDS.time(operation="hash"):
+            return hash_password(password)
+
+    def create_user(self, username: str, password: Optional[str] = None, hashed_password: Optional[str] = None, **kwargs):
+        """Create a user from a plain password or an already computed hash"""
+        with self.pool.connection() as conn:
             try:
                 conn.execute("""
                     INSERT INTO users (
@@ -51,7 +103,7 @@ class UserDB:
                     ) VALUES (?, ?, ?, ?, ?)
                 """, (
                     username,
-                    pwd_context.hash(password),
+                    hashed_password or self._hash_password(password),
                     kwargs.get("full_name", ""),
                     kwargs.get("email", ""),
                     kwargs.get("role", "user")
@@ -60,33 +112,130 @@ class UserDB:
                 return True
             except sqlite3.IntegrityError:
                 return False
+            finally:
+                self.invalidate_user(username)
+
+    def invalidate_user(self, username: Optional[str] = None):
+        """Evict a cached user record (or all of them)"""
+        if username is None:
+            self.user_cache.clear()
+        else:
+            self.user_cache.invalidate(username)
+
+    def get_cached_user(self, username: str) -> Optional[Dict]:
+        """Cached user record without touching the database (None on miss)"""
+        if (cached := self.user_cache.get(username)) is not None:
+            return dict(cached)
+        return None
 
-    def get_user(self, username: str) -> Optional[Dict]:
-        with sqlite3.connect(self.db_path) as conn:
+    def get_user(self, username: str, use_cache: bool = True) -> Optional[Dict]:
+        if use_cache and (cached := self.get_cached_user(username)) is not None:
+            return cached
+        with self.pool.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
             if user := cursor.fetchone():
+                user = dict(user)
+                self.user_cache.set(username, user)
                 return dict(user)
             return None
 
+    def update_user(self, username: str, **fields) -> bool:
+        """Update profile, role or disabled flag; evicts the cached record"""
+        updates = {k: v for k, v in fields.items() if k in UPDATABLE_FIELDS and v is not None}
+        if not updates:
+            return False
+        set_clause = ", ".join(f"{k} = ?" for k in updates)
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                f"UPDATE users SET {set_clause} WHERE username = ?",
+                (*updates.values(), username)
+            )
+            if cursor.rowcount and (updates.get("disabled") or "role" in updates):
+                # Outstanding sessions must log in again to pick up the change
+                self._revoke_user_tokens(conn, username)
+            conn.commit()
+        self.invalidate_user(username)
+        return cursor.rowcount > 0
+
     def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
-        if user := self.get_user(username):
-            if pwd_context.verify(password, user["hashed_password"]):
+        if user := self.get_user(username, use_cache=False):
+            with PASSWORD_HASH_SECONDS.time(operation="verify"):
+                verified = verify_password(password, user["hashed_password"])
+            if verified:
                 # Update last login time
-                with sqlite3.connect(self.db_path) as conn:
+                with self.pool.connection() as conn:
                     conn.execute(
                         "UPDATE users SET last_login = ? WHERE username = ?",
                         (datetime.now(), username)
                     )
                     conn.commit()
+                self.invalidate_user(username)
                 return user
         return None
 
     def update_last_login(self, username: str):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
+            conn.execute(
+                "UPDATE users SET last_login = ? WHERE username = ?",
+                (datetime.now(), username)
+            )
+            conn.commit()
+        self.invalidate_user(username)
+
+    def record_login(self, username: str, refresh_jti: Optional[str] = None, refresh_expires_at: Optional[float] = None):
+        """Update last_login and store a new refresh token in one transaction"""
+        with self.pool.connection() as conn:
             conn.execute(
                 "UPDATE users SET last_login = ? WHERE username = ?",
                 (datetime.now(), username)
             )
-            conn.commit()
\ No newline at end of file
+            if refresh_jti is not None:
+                self._store_refresh_token(conn, refresh_jti, username, refresh_expires_at)
+        self.invalidate_user(username)
+
+    def _store_refresh_token(self, conn: sqlite3.Connection, jti: str, username: str, expires_at: float):
+        conn.execute("DELETE FROM refresh_tokens WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "INSERT INTO refresh_tokens (jti, username, expires_at) VALUES (?, ?, ?)",
+            (jti, username, expires_at)
+        )
+
+    def _revoke_user_tokens(self, conn: sqlite3.Connection, username: str):
+        conn.execute("UPDATE refresh_tokens SET revoked = 1 WHERE username = ? AND revoked = 0", (username,))
+
+    def rotate_refresh_token(self, jti: str, username: str, new_jti: str, new_expires_at: float) -> str:
+        """
+        Exchange a refresh token for a new one.
+
+        Returns "rotated", "invalid" (unknown, expired or someone else's) or
+        "reused" (already rotated or revoked; every token of the user is then
+        revoked, since the old one has probably leaked).
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE refresh_tokens SET revoked = 1, replaced_by = ?
+                WHERE jti = ? AND username = ? AND revoked = 0 AND expires_at > ?
+                """,
+                (new_jti, jti, username, time.time())
+            )
+            if cursor.rowcount:
+                self._store_refresh_token(conn, new_jti, username, new_expires_at)
+                return "rotated"
+            row = conn.execute(
+                "SELECT revoked FROM refresh_tokens WHERE jti = ? AND username = ?", (jti, username)
+            ).fetchone()
+            if row is not None and row[0]:
+                self._revoke_user_tokens(conn, username)
+                return "reused"
+            return "invalid"
+
+    def revoke_refresh_token(self, jti: str, username: str) -> bool:
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                "UPDATE refresh_tokens SET revoked = 1 WHERE jti = ? AND username = ? AND revoked = 0",
+                (jti, username)
+            )
+            return cursor.rowcount > 0
@@ -0,0 +1,443 @@
+import datetime
+import html
+import math
+import posixpath
+import re
+import shutil
+import zipfile
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes of sheet XML decompressed per step while reading or rewriting
+BLOCK_SIZE = 1 << 20
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS = {
+    "main": _MAIN_NS,
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+_ROW = re.compile(rb'<row\b[^>]*?\br="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+_CELL = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_CELL_REF = re.compile(rb'\br="([A-Z]+)\d+"')
+_CELL_STYLE = re.compile(rb'\bs="(\d+)"')
+_CELL_TYPE = re.compile(rb'\bt="(\w+)"')
+_VALUE = re.compile(rb'<v(?:\s[^>]*)?>(.*?)</v>', re.S)
+_TEXT = re.compile(rb'<t(?:\s[^>]*)?>(.*?)</t>', re.S)
+_SPANS = re.compile(rb'\sspans="[^"]*"')
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Built-in number formats that display dates/times
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+# Format given to cells that get a date but had no date format (as openpyxl writes datetimes)
+DATE_FORMAT = "yyyy-mm-dd h:mm:ss"
+_STYLES_PART = "xl/styles.xml"
+
+_XF = re.compile(rb'<xf\b[^>]*?(?:/>|>.*?</xf>)', re.S)
+_CELL_XFS = re.compile(rb'<cellXfs\b[^>]*>(.*?)</cellXfs>', re.S)
+_NUM_FMTS = re.compile(rb'<numFmts\b[^>]*?(?:/>|>(.*?)</numFmts>)', re.S)
+_COUNT = re.compile(rb'\scount="\d+"')
+_STYLE_SHEET = re.compile(rb'<styleSheet\b[^>]*>')
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letters: bytes) -> int:
+    index = 0
+    for ch in letters:
+        index = index * 26 + ch - 64
+    return index
+
+
+def _rows(source) -> Iterator["re.Match"]:
+    """<row> elements of a sheet XML stream, read a block at a time"""
+    buffer = b""
+    while block := source.read(BLOCK_SIZE):
+        buffer += block
+        # Everything before the last row start holds only complete rows
+        split = buffer.rfind(b"<row ")
+        if split > 0:
+            yield from _ROW.finditer(buffer, 0, split)
+            buffer = buffer[split:]
+    yield from _ROW.finditer(buffer)
+
+
+class XlsxFile:
+    """
+    Streaming access to the sheets of an .xlsx file without loading it whole.
+
+    ``read_row``/``find_rows`` read cell values straight from a sheet's XML,
+    resolving only the shared strings they need, and ``patch`` writes a copy
+    with some cells replaced: only the XML of the edited sheets is rewritten,
+    every other part of the file is copied through.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        workbook = ElementTree.fromstring(self._zip.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        targets, self._shared_strings_part = {}, None
+        for rel in rels.findall("rel:Relationship", _NS):
+            target = rel.get("Target", "")
+            target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+                posixpath.join("xl", target)
+            )
+            targets[rel.get("Id")] = target
+            if rel.get("Type", "").endswith("/sharedStrings"):
+                self._shared_strings_part = target
+        # Sheet title -> zip member holding its XML
+        self.sheet_parts = {
+            sheet.get("name"): targets.get(sheet.get(_REL_ID))
+            for sheet in workbook.findall("main:sheets/main:sheet", _NS)
+        }
+        props = workbook.find("main:workbookPr", _NS)
+        self.date1904 = props is not None and props.get("date1904") in ("1", "true")
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self.sheet_parts)
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _shared_strings(self, wanted: Callable[[int, str], bool], last: Optional[int] = None) -> Dict[int, str]:
+        """
+        Shared strings (index -> text) for which ``wanted(index, text)``, up to
+        index ``last``. The table is streamed, so only the wanted ones are held.
+        """
+        strings: Dict[int, str] = {}
+        if self._shared_strings_part not in self._zip.namelist():
+            return strings
+        with self._zip.open(self._shared_strings_part) as part:
+            index, root = 0, None
+            for event, element in ElementTree.iterparse(part, events=("start", "end")):
+                if root is None:
+                    root = element
+                    continue
+                if event != "end" or element.tag != f"{{{_MAIN_NS}}}si":
+                    continue
+                text = element.find("main:t", _NS)
+                text = text.text or "" if text is not None else "".join(
+                    r.findtext("main:t", "", _NS) for r in element.findall("main:r", _NS)
+                )
+                if wanted(index, text):
+                    strings[index] = text
+                if last is not None and index >= last:
+                    break
+                index += 1
+                root.clear()
+        return strings
+
+    @staticmethod
+    def _string_index(attrs: bytes, body: Optional[bytes]) -> Optional[int]:
+        """Shared string index of a cell, if it holds one"""
+        if not body or b't="s"' not in attrs:
+            return None
+        value = _VALUE.search(body)
+        return int(value.group(1)) if value else None
+
+    def _value(self, attrs: bytes, body: Optional[bytes], strings: Dict[int, str]):
+        """Cell value; shared strings not in ``strings`` come back as None"""
+        if not body:
+            return None
+        kind = _CELL_TYPE.search(attrs)
+        kind = kind.group(1) if kind else b"n"
+        if kind == b"inlineStr":
+            return html.unescape(b"".join(_TEXT.findall(body)).decode())
+        value = _VALUE.search(body)
+        if value is None:
+            return None
+        value = value.group(1)
+        if kind == b"s":
+            return strings.get(int(value))
+        if kind == b"b":
+            return value == b"1"
+        if kind == b"n":
+            return float(value) if any(c in value for c in b".eE") else int(value)
+        return html.unescape(value.decode())  # str, e (error), d (ISO date)
+
+    def _cells(
+        self, title: str, columns: Optional[Collection[int]] = None, min_row: int = 1, max_row: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[int, Tuple[bytes, Optional[bytes]]]]]:
+        """(row number, {column number: (cell attributes, cell body)}) for each row of a sheet"""
+        with self._zip.open(self.sheet_parts[title]) as part:
+            for row in _rows(part):
+                number = int(row.group(1))
+                if number < min_row:
+                    continue
+                if max_row is not None and number > max_row:
+                    return
+                cells = {}
+                for cell in _CELL.finditer(row.group(0)):
+                    ref = _CELL_REF.search(cell.group(1))
+                    if ref is None:
+                        continue  # Cells without references can't be placed
+                    index = _column_index(ref.group(1))
+                    if columns is None or index in columns:
+                        cells[index] = (cell.group(1), cell.group(2))
+                yield number, cells
+
+    def read_row(self, title: str, number: int) -> Dict[int, object]:
+        """
+        {column number: value} for one row of a sheet (empty if it has none).
+        Values are returned raw: dates stay Excel serial numbers.
+        """
+        cells = next((cells for _, cells in self._cells(title, min_row=number, max_row=number)), {})
+        indexes = {i for i in (self._string_index(*cell) for cell in cells.values()) if i is not None}
+        strings = self._shared_strings(lambda i, _: i in indexes, max(indexes)) if indexes else {}
+        return {column: self._value(*cell, strings) for column, cell in cells.items()}
+
+    def find_rows(
+        self, title: str, column: int, values: Collection[str], key: Callable[[object], str] = str
+    ) -> Dict[str, List[int]]:
+        """
+        value -> numbers of the rows whose cell in ``column`` is that value
+        (compared as ``key(cell value)``), for the given values only: memory
+        depends on the number of values, not the size of the sheet.
+        """
+        found: Dict[str, List[int]] = {}
+        if not values:
+            return found
+        strings = self._shared_strings(lambda _, text: key(text) in values)
+        for number, cells in self._cells(title, columns=(column,), min_row=2):
+            if column not in cells:
+                continue
+            value = self._value(*cells[column], strings)
+            if value is not None and (value := key(value)) in values:
+                found.setdefault(value, []).append(number)
+        return found
+
+    def patch(self, target_path: str, edits: Dict[str, Dict[int, Dict[int, object]]]) -> bool:
+        """
+        Write a copy of this workbook to ``target_path`` with cells replaced.
+
+        ``edits`` maps sheet title -> row number -> column number -> value.
+        Strings are written inline and cell styles are kept; a date written
+        to a cell without a date format gets a copy of its style with one
+        (added to styles.xml), so dates stay dates. Returns False (target
+        left incomplete) when a sheet, row or the style sheet can't be handled.
+        """
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+        members = {}
+        for title, rows in edits.items():
+            member = self.sheet_parts.get(title)
+            if member is None or member not in self._zip.namelist():
+                return False
+            members[member] = rows
+        names = self._zip.namelist()
+        styles = _StyleSheet(self._zip.read(_STYLES_PART) if _STYLES_PART in names else None)
+        patcher = _RowPatcher(styles, CALENDAR_MAC_1904 if self.date1904 else CALENDAR_WINDOWS_1900)
+
+        # The style sheet goes last: patching the sheets may add date styles to it
+        infos = sorted(self._zip.infolist(), key=lambda info: info.filename == _STYLES_PART)
+        with zipfile.ZipFile(target_path, "w") as target:
+            for info in infos:
+                if info.filename == _STYLES_PART:
+                    xml = styles.render()
+                    if xml is None:
+                        logger.info("Could not add a date format to the style sheet")
+                        return False
+                    target.writestr(info, xml)
+                    continue
+                with self._zip.open(info) as reader, target.open(
+                    info, "w", force_zip64=info.file_size > 0x7FFFFFFF
+                ) as writer:
+                    if info.filename not in members:
+                        shutil.copyfileobj(reader, writer, BLOCK_SIZE)
+                        continue
+                    missing = patcher.copy(reader, writer, members[info.filename])
+                    if missing:
+                        logger.info(f"Rows {sorted(missing)[:5]} not found or not patchable in {info.filename}")
+                        return False
+        return True
+
+
+class _StyleSheet:
+    """
+    Date formats of a workbook's cell styles, plus date-formatted copies of
+    other styles made while patching (written out by ``render``).
+    """
+
+    def __init__(self, xml: Optional[bytes]):
+        from openpyxl.styles.numbers import is_date_format
+
+        self.xml = xml
+        self.date_styles: Set[bytes] = set()
+        self.custom_formats: Dict[int, str] = {}
+        self.xf_count = 0
+        # original style (None: no s attribute) -> index of its date-formatted copy
+        self.added: Dict[Optional[bytes], bytes] = {}
+        if xml is None:
+            return
+        styles = ElementTree.fromstring(xml)
+        self.custom_formats = {
+            int(fmt.get("numFmtId")): fmt.get("formatCode", "")
+            for fmt in styles.findall("main:numFmts/main:numFmt", _NS)
+        }
+        xfs = styles.findall("main:cellXfs/main:xf", _NS)
+        self.xf_count = len(xfs)
+        for index, xf in enumerate(xfs):
+            fmt_id = int(xf.get("numFmtId", 0))
+            if fmt_id in _BUILTIN_DATE_FORMATS or (
+                fmt_id in self.custom_formats and is_date_format(self.custom_formats[fmt_id])
+            ):
+                self.date_styles.add(str(index).encode())
+
+    def date_style(self, style: Optional[bytes]) -> Optional[bytes]:
+        """A style showing a date, as close to ``style`` as possible (None without a style sheet)"""
+        if style in self.date_styles:
+            return style
+        if self.xml is None:
+            return None
+        if style not in self.added:
+            self.added[style] = str(self.xf_count + len(self.added)).encode()
+        return self.added[style]
+
+    def render(self) -> Optional[bytes]:
+        """The style sheet with the added styles, or None if its layout isn't understood"""
+        if not self.added:
+            return self.xml
+        xml = self.xml
+        fmt_id = next((i for i, code in self.custom_formats.items() if code == DATE_FORMAT), None)
+        cell_xfs = _CELL_XFS.search(xml)
+        if cell_xfs is None:
+            return None
+        xfs = _XF.findall(cell_xfs.group(1))
+        if len(xfs) != self.xf_count or not xfs:
+            return None
+        new_fmt_id = fmt_id if fmt_id is not None else max([163, *self.custom_formats]) + 1
+
+        copies = []
+        for original in sorted(self.added, key=lambda s: int(self.added[s])):
+            base = xfs[int(original)] if original is not None and int(original) < len(xfs) else xfs[0]
+            open_tag = base[:base.index(b">")].rstrip(b"/").rstrip()
+            rest = base[len(open_tag):]
+            open_tag = re.sub(rb'\s(?:numFmtId|applyNumberFormat)="[^"]*"', b"", open_tag)
+            copies.append(open_tag + f' numFmtId="{new_fmt_id}" applyNumberFormat="1"'.encode() + rest)
+        open_tag = xml[cell_xfs.start():cell_xfs.start(1)]
+        open_tag = _COUNT.sub(f' count="{self.xf_count + len(copies)}"'.encode(), open_tag)
+        xml = xml[:cell_xfs.start()] + open_tag + cell_xfs.group(1) + b"".join(copies) + xml[cell_xfs.end(1):]
+
+        if fmt_id is None:
+            num_fmt = f'<numFmt numFmtId="{new_fmt_id}" formatCode="{DATE_FORMAT}"/>'.encode()
+            num_fmts = _NUM_FMTS.search(xml)
+            if num_fmts is not None:
+                body = num_fmts.group(1) or b""
+                count = len(self.custom_formats) + 1
+                xml = (
+                    xml[:num_fmts.start()] + f'<numFmts count="{count}">'.encode() + body + num_fmt
+                    + b"</numFmts>" + xml[num_fmts.end():]
+                )
+            else:
+                # numFmts is the style sheet's first child
+                style_sheet = _STYLE_SHEET.search(xml)
+                if style_sheet is None:
+                    return None
+                xml = (
+                    xml[:style_sheet.end()] + b'<numFmts count="1">' + num_fmt + b"</numFmts>"
+                    + xml[style_sheet.end():]
+                )
+        return xml
+
+
+class _RowPatcher:
+    """Rewrites the cells of selected rows in a sheet's XML; everything else is copied as is"""
+
+    def __init__(self, styles: _StyleSheet, epoch: datetime.datetime):
+        self.styles = styles
+        self.epoch = epoch
+
+    def _cell(self, ref: str, value, style: Optional[bytes]) -> Optional[bytes]:
+        """Cell XML for a value, or None if a date can't be given a date format"""
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            from openpyxl.utils.datetime import to_excel
+
+            style = self.styles.date_style(style)
+            if style is None:
+                return None
+            return f'<c r="{ref}" s="{style.decode()}"><v>{to_excel(value, self.epoch)!r}</v></c>'.encode()
+        style_attr = f' s="{style.decode()}"' if style else ""
+        if value is None:
+            return f'<c r="{ref}"{style_attr}/>'.encode()
+        if isinstance(value, bool):
+            return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'.encode()
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            return f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>'.encode()
+        text = escape(_ILLEGAL_XML.sub("", str(value)))
+        return (
+            f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+        ).encode()
+
+    def _patch_row(self, row: "re.Match", updates: Dict[int, object]) -> Optional[bytes]:
+        number, element = int(row.group(1)), row.group(0)
+        open_end = element.index(b">") + 1
+        if element[open_end - 2:open_end] == b"/>":
+            open_tag, body = element[:open_end - 2] + b">", b""
+        else:
+            open_tag, body = element[:open_end], element[open_end:-len(b"</row>")]
+
+        cells: Dict[int, bytes] = {}
+        styles: Dict[int, Optional[bytes]] = {}
+        for cell in _CELL.finditer(body):
+            ref = _CELL_REF.search(cell.group(1))
+            if ref is None:
+                return None  # Cells without references can't be placed
+            index = _column_index(ref.group(1))
+            style = _CELL_STYLE.search(cell.group(1))
+            cells[index] = cell.group(0)
+            styles[index] = style.group(1) if style else None
+        for index, value in updates.items():
+            cell = self._cell(f"{_column_letter(index)}{number}", value, styles.get(index))
+            if cell is None:
+                return None
+            cells[index] = cell
+        # spans is only an optimisation hint and may no longer be right
+        return _SPANS.sub(b"", open_tag) + b"".join(cells[i] for i in sorted(cells)) + b"</row>"
+
+    def copy(self, source, target, rows: Dict[int, Dict[int, object]]) -> Set[int]:
+        """Stream a sheet's XML from source to target, rewriting ``rows``; returns rows not found"""
+        missing = set(rows)
+        buffer = b""
+
+        def flush(data: bytes, end: int):
+            position = 0
+            for row in _ROW.finditer(data, 0, end):
+                number = int(row.group(1))
+                if number not in missing:
+                    continue
+                patched = self._patch_row(row, rows[number])
+                if patched is None:
+                    continue
+                target.write(data[position:row.start()])
+                target.write(patched)
+                position = row.end()
+                missing.discard(number)
+            target.write(data[position:end])
+
+        while block := source.read(BLOCK_SIZE):
+            buffer += block
+            split = buffer.rfind(b"<row ")
+            if split > 0:
+                flush(buffer, split)
+                buffer = buffer[split:]
+        flush(buffer, len(buffer))
+        return missing
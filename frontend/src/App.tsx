@@ -1,21 +1,46 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import Login from './components/Login';
 import AdminDashboard from './components/AdminDashboard';
+import { refreshAccessToken, revokeRefreshToken } from './api';
+
+// Access tokens last 30 minutes; renew them well before that
+const TOKEN_REFRESH_INTERVAL_MS = 20 * 60 * 1000;
 
 const App = () => {
   const [token, setToken] = useState('');
   const [role, setRole] = useState('');
+  const [refreshToken, setRefreshToken] = useState('');
 
-  const handleLogin = (newToken: string, newRole: string) => {
+  const handleLogin = (newToken: string, newRole: string, newRefreshToken?: string) => {
     setToken(newToken);
     setRole(newRole);
+    setRefreshToken(newRefreshToken || '');
   };
 
   const handleLogout = () => {
+    if (refreshToken) {
+      revokeRefreshToken(refreshToken).catch(() => undefined);
+    }
     setToken('');
     setRole('');
+    setRefreshToken('');
   };
 
+  useEffect(() => {
+    if (!refreshToken) return;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await refreshAccessToken(refreshToken);
+        handleLogin(data.access_token, data.role, data.refresh_token);
+      } catch (err) {
+        setToken('');
+        setRole('');
+        setRefreshToken('');
+      }
+    }, TOKEN_REFRESH_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [refreshToken]);
+
   return (
     <div style={{ minHeight: '100vh', backgroundColor: '#f5f5f5' }}>
       {!token ? (
@@ -36,6 +36,18 @@ export const getAssets = async (assetTag: string, token: string) => {
   return await response.json();
 };
 
+export const getAssetSummary = async (token: string) => {
+  const response = await fetch(`${API_BASE}/assets/summary`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to load inventory summary');
+  }
+  return await response.json();
+};
+
 export const reassignAsset = async (assetTag: string, data: ReassignmentData, token: string) => {
   const response = await fetch(`${API_BASE}/assets/${assetTag}/reassign`, {
     method: 'PUT',
@@ -50,9 +62,50 @@ export const reassignAsset = async (assetTag: string, data: ReassignmentData, to
 
 export const syncData = async (token: string) => {
   const response = await fetch(`${API_BASE}/sync/refresh`, {
+    method: 'POST',
     headers: {
       'Authorization': `Bearer ${token}`,
     },
   });
+  if (!response.ok) {
+    throw new Error('Failed to start sync');
+  }
+  return await response.json();
+};
+
+export const getSyncStatus = async (jobId: string, token: string) => {
+  const response = await fetch(`${API_BASE}/sync/status/${jobId}`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to get sync status');
+  }
+  return await response.json();
+};
+
+export const refreshAccessToken = async (refreshToken: string) => {
+  const response = await fetch(`${API_BASE}/token/refresh`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  });
+  if (!response.ok) {
+    throw new Error('Session expired');
+  }
+  return await response.json();
+};
+
+export const revokeRefreshToken = async (refreshToken: string) => {
+  const response = await fetch(`${API_BASE}/token/revoke`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  });
   return await response.json();
-};
\ No newline at end of file
+};
@@ -2,6 +2,7 @@ import { useState } from 'react';
 import Register from './Register';
 import AssetSearch from './AssetSearch';
 import SyncButton from './SyncButton';
+import InventorySummary from './InventorySummary';
 
 interface AdminDashboardProps {
   token: string;
@@ -61,10 +62,24 @@ const AdminDashboard = ({ token, onLogout }: AdminDashboardProps) => {
         >
           User Management
         </button>
+        <button
+          onClick={() => setActiveTab('summary')}
+          style={{
+            padding: '10px 15px',
+            backgroundColor: activeTab === 'summary' ? '#4CAF50' : '#ddd',
+            color: activeTab === 'summary' ? 'white' : '#333',
+            border: 'none',
+            borderRadius: '4px',
+            cursor: 'pointer'
+          }}
+        >
+          Inventory Summary
+        </button>
       </div>
 
       {activeTab === 'assets' && <AssetSearch token={token} />}
       {activeTab === 'users' && <Register token={token} onRegister={() => {}} />}
+      {activeTab === 'summary' && <InventorySummary token={token} />}
     </div>
   );
 };
@@ -0,0 +1,85 @@
+import { useEffect, useState } from 'react';
+import { getAssetSummary } from '../api';
+import { AssetSummary } from '../types';
+
+interface InventorySummaryProps {
+  token: string;
+}
+
+const cardStyle = {
+  flex: '1',
+  padding: '15px',
+  border: '1px solid #ddd',
+  borderRadius: '4px',
+  backgroundColor: '#fafafa'
+};
+
+const CountTable = ({ title, rows }: { title: string; rows: { label: string | null; count: number }[] }) => (
+  <div style={cardStyle}>
+    <h3 style={{ marginTop: 0, color: '#333' }}>{title}</h3>
+    <table style={{ width: '100%', borderCollapse: 'collapse' }}>
+      <tbody>
+        {rows.map((row) => (
+          <tr key={row.label ?? ''} style={{ borderBottom: '1px solid #eee' }}>
+            <td style={{ padding: '4px' }}>{row.label || '(blank)'}</td>
+            <td style={{ padding: '4px', textAlign: 'right' }}>{row.count}</td>
+          </tr>
+        ))}
+      </tbody>
+    </table>
+  </div>
+);
+
+const InventorySummary = ({ token }: InventorySummaryProps) => {
+  const [summary, setSummary] = useState<AssetSummary | null>(null);
+  const [error, setError] = useState('');
+
+  useEffect(() => {
+    getAssetSummary(token)
+      .then((data) => {
+        setSummary(data);
+        setError('');
+      })
+      .catch(() => setError('Failed to load inventory summary'));
+  }, [token]);
+
+  if (error) return <p style={{ color: 'red' }}>{error}</p>;
+  if (!summary) return <p>Loading...</p>;
+
+  return (
+    <div>
+      <div style={{ display: 'flex', gap: '10px', marginBottom: '20px' }}>
+        <div style={cardStyle}>
+          <h3 style={{ marginTop: 0, color: '#333' }}>Total assets</h3>
+          <p style={{ fontSize: '24px', margin: 0 }}>{summary.total}</p>
+        </div>
+        <div style={cardStyle}>
+          <h3 style={{ marginTop: 0, color: '#333' }}>Assigned / unassigned</h3>
+          <p style={{ fontSize: '24px', margin: 0 }}>
+            {summary.assignment.assigned} / {summary.assignment.unassigned}
+          </p>
+        </div>
+        <div style={cardStyle}>
+          <h3 style={{ marginTop: 0, color: '#333' }}>Pending returns</h3>
+          <p style={{ fontSize: '24px', margin: 0 }}>{summary.pending_returns.count}</p>
+        </div>
+      </div>
+      <div style={{ display: 'flex', gap: '10px' }}>
+        <CountTable
+          title="By department"
+          rows={summary.by_department.map((row) => ({ label: row.department, count: row.count }))}
+        />
+        <CountTable
+          title="By location"
+          rows={summary.by_location.map((row) => ({ label: row.location, count: row.count }))}
+        />
+        <CountTable
+          title="Upcoming returns"
+          rows={summary.pending_returns.upcoming.map((row) => ({ label: row.date, count: row.count }))}
+        />
+      </div>
+    </div>
+  );
+};
+
+export default InventorySummary;
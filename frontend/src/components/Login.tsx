@@ -2,7 +2,7 @@ import { useState } from 'react';
 import { login } from '../api';
 
 interface LoginProps {
-  onLogin: (token: string, role: string) => void;
+  onLogin: (token: string, role: string, refreshToken?: string) => void;
 }
 
 const Login = ({ onLogin }: LoginProps) => {
@@ -15,7 +15,7 @@ const Login = ({ onLogin }: LoginProps) => {
     try {
       const data = await login(username, password);
       if (data.access_token) {
-        onLogin(data.access_token, data.role);
+        onLogin(data.access_token, data.role, data.refresh_token);
       } else {
         setError('Invalid credentials');
       }
@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { syncData } from '../api';
+import { syncData, getSyncStatus } from '../api';
 
 interface SyncButtonProps {
   token: string;
@@ -13,8 +13,14 @@ const SyncButton = ({ token }: SyncButtonProps) => {
     setIsSyncing(true);
     setMessage('');
     try {
-      const result = await syncData(token);
-      setMessage(result.message || 'Sync completed successfully');
+      const queued = await syncData(token);
+      let job = queued.details;
+      // Sync runs in the background; poll until the job finishes
+      while (job && (job.status === 'queued' || job.status === 'running')) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        job = await getSyncStatus(queued.job_id, token);
+      }
+      setMessage(job?.status === 'succeeded' ? 'Sync completed successfully' : 'Sync failed');
     } catch (err) {
       setMessage('Sync failed');
     } finally {
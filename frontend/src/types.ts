@@ -21,4 +21,16 @@ export interface ReassignmentData {
   location?: string;
   date_of_return?: string;
   date_of_reassign?: string;
-}
\ No newline at end of file
+}
+
+export interface AssetSummary {
+  total: number;
+  by_department: { department: string | null; count: number }[];
+  by_location: { location: string | null; count: number }[];
+  assignment: { assigned: number; unassigned: number };
+  pending_returns: {
+    as_of: string;
+    count: number;
+    upcoming: { date: string; count: number }[];
+  };
+}